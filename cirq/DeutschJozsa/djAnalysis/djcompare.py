@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Classical versus quantum query counts for Deutsch-Jozsa.
+
+Every classical solver from python/djsolver.py is run against a
+CountingOracle so it is charged for each distinct input it looks at.  The
+quantum solver simulates the phase oracle circuit; it applies U_f exactly
+once, so it is charged one query.  compare sweeps n and a set of function
+families and write_table saves one row per run.
+
+djsolver lives in the top level python directory, which the entry script
+puts on sys.path (hq.py and dj_example.py do).
+"""
+
+import csv
+import time
+
+import numpy as np
+
+import djsolver
+
+from . import djsim
+
+#%%
+
+def _popcount(x):
+    """ number of 1 bits in each entry of x """
+    x = np.asarray(x, dtype=np.uint64)
+    count = np.zeros(x.shape, dtype=np.uint64)
+    while np.any(x):
+        count += x & np.uint64(1)
+        x = x >> np.uint64(1)
+    return count
+
+# name -> (is constant, f(n)) with every f vectorized over integer inputs
+FAMILIES = {
+    "zero": (True, lambda n: lambda x: np.zeros(np.shape(x), dtype=bool)),
+    "one": (True, lambda n: lambda x: np.ones(np.shape(x), dtype=bool)),
+    "low bit": (False, lambda n: lambda x: np.asarray(x) % 2 == 1),
+    "high bit": (False, lambda n: lambda x: np.asarray(x) >> (n - 1) == 1),
+    "parity": (False, lambda n: lambda x: _popcount(x) % 2 == 1),
+}
+
+def quantum_solve(f, n):
+    """
+    Deutsch-Jozsa on the simulated phase oracle circuit.  U_f is applied
+    once, so the query count is 1.  The circuit is simulated with djsim
+    directly rather than built with djhelp.make_dj_circuit, so the
+    comparison runs without cirq.
+    """
+
+    state = djsim.dj_initial_state(n, phase_oracle=True)
+    djsim.apply_diagonal(state, djsim.phase_diagonal(f, n), range(n))
+    djsim.wht(state, range(n))
+    if np.isclose(djsim.input_probabilities(state, n)[0], 1):
+        return "constant", 1
+    return "balanced", 1
+
+def _counted(solver):
+    """
+    Adapt a classical solver returning a verdict into one returning
+    (verdict, queries) by running it on a CountingOracle.
+    """
+
+    def run(f, n):
+        oracle = djsolver.CountingOracle(f)
+        result = solver(oracle, n)
+        verdict = result[0] if isinstance(result, tuple) else result
+        return str(verdict), oracle.queries
+    return run
+
+SOLVERS = {
+    "solve": _counted(djsolver.solve),
+    "djsolver": _counted(djsolver.djsolver),
+    "random_solve": _counted(djsolver.random_solve),
+    "Nrandom_solve": _counted(lambda f, n: djsolver.Nrandom_solve(f, n, 5)),
+    "confidence_solve": _counted(djsolver.confidence_solve),
+    "quantum": quantum_solve,
+}
+
+#%%
+
+def compare(ns, families=None, solvers=None, trials=1):
+    """
+    Run every solver on every function family for each n in ns, trials
+    times each.  Returns a list of row dicts with the query count, wall time
+    and whether the verdict was right.
+    """
+
+    if families is None:
+        families = FAMILIES
+    if solvers is None:
+        solvers = SOLVERS
+    rows = []
+    for n in ns:
+        for family in families:
+            constant, make_f = families[family]
+            expected = "constant" if constant else "balanced"
+            for name in solvers:
+                for trial in range(trials):
+                    f = make_f(n)
+                    start = time.perf_counter()
+                    verdict, queries = solvers[name](f, n)
+                    seconds = time.perf_counter() - start
+                    rows.append({"n": n, "family": family, "solver": name,
+                                 "trial": trial, "queries": queries,
+                                 "seconds": seconds,
+                                 "correct": verdict == expected})
+    return rows
+
+def write_table(rows, path=None):
+    """
+    Print rows as a table and, given a path, also write them as CSV.
+    """
+
+    fields = ["n", "family", "solver", "trial", "queries", "seconds",
+              "correct"]
+    print("%4s %-10s %-18s %5s %10s %10s %8s" % tuple(fields))
+    for row in rows:
+        print("%4d %-10s %-18s %5d %10d %10.6f %8s" %
+              tuple(row[k] for k in fields))
+    if path is not None:
+        with open(path, "w", newline="") as out:
+            writer = csv.DictWriter(out, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
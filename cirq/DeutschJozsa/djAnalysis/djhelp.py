@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit construction helpers for the Deutsch-Jozsa examples.
+
+make_dj_circuit builds the complete circuit around an oracle.  dj_template
+keeps the fixed parts of that circuit for each input length so a sweep over
+many oracles only builds them once.  Both have a phase oracle mode where f
+is applied as a diagonal phase on the input qubits and no work qubit is
+allocated, which halves the size of the simulated state.
+"""
+
+import functools
+
+import numpy as np
+import cirq as cq
+
+from . import djopt, djsim
+
+#%%
+
+def make_dj_circuit(length, unitary_f, phase_oracle=False):
+    """ Given an iterable/generator of the circuit for the unitary operator
+    (unitary_f) of the boolean function f which operators on length bits,
+    construct and return the complete circuit for the Deutsch-Jozsa
+    algorithm.  With phase_oracle, unitary_f must instead apply (-1)^f(x)
+    to the input qubits (see phase_oracle and to_phase_oracle) and no work
+    qubit is used. """
+    # initialize the work space to H|1>
+    if not phase_oracle:
+        yield cq.X(cq.LineQubit(length))
+        yield cq.H(cq.LineQubit(length))
+
+    # H on 'input' space
+    for i in range(length):
+        yield cq.H(cq.LineQubit(i))
+    # Apply U_f
+    yield unitary_f
+    # H on 'input space
+    for i in range(length):
+        yield cq.H(cq.LineQubit(i))
+
+    # measure input space: all 0 = constant , !(all 0) = balanced
+    for i in range(length):
+        yield cq.MeasurementGate(key="q" + str(length-i))(cq.LineQubit(i))
+
+#%%
+
+class PhaseOracleGate(cq.Gate):
+    """
+    The diagonal gate |x> -> (-1)^f(x) |x> for a boolean function f given as
+    the array of its values, x read high-order (first) qubit first.
+    """
+
+    def __init__(self, values):
+        self.diagonal = np.where(np.asarray(values, dtype=bool), -1.0, 1.0)
+
+    def num_qubits(self):
+        """ Number of qubits the gate acts on """
+        return int(np.log2(len(self.diagonal)))
+
+    def _unitary_(self):
+        return np.diag(self.diagonal)
+
+    def __str__(self):
+        return "Uf"
+
+def phase_oracle(f, length):
+    """
+    The phase oracle for the boolean function f on length bits, applied to
+    LineQubits 0 .. length-1.  f may be a numpy-vectorized function.
+    """
+
+    gate = PhaseOracleGate(djsim.phase_diagonal(f, length) < 0)
+    return gate.on(*cq.LineQubit.range(length))
+
+def to_phase_oracle(unitary_f, length):
+    """
+    Rewrite an oracle that writes f into LineQubit(length) with X, CNOT and
+    CCX gates as a phase oracle on the input qubits only.
+    """
+
+    return list(from_ops(djsim.phase_ops(to_ops(unitary_f), length)))
+
+#%%
+
+_GATE_NAMES = ((cq.X, "X"), (cq.Z, "Z"), (cq.H, "H"), (cq.CNOT, "CNOT"),
+               (cq.CZ, "CZ"), (cq.CCX, "CCX"), (cq.CCZ, "CCZ"))
+
+def to_ops(unitary_f):
+    """
+    Convert an op tree of cirq operations on LineQubits into the operation
+    tuples used by djsim.  Gates without a name in djsim are carried as their
+    unitary matrix.
+    """
+
+    for op in cq.flatten_op_tree(unitary_f):
+        qubits = tuple(q.x for q in op.qubits)
+        if isinstance(op.gate, PhaseOracleGate):
+            yield (op.gate.diagonal,) + qubits
+            continue
+        for gate, name in _GATE_NAMES:
+            if op.gate == gate:
+                yield (name,) + qubits
+                break
+        else:
+            yield (cq.unitary(op),) + qubits
+
+def from_ops(ops):
+    """
+    Convert djsim operation tuples with named gates back into cirq
+    operations on LineQubits.
+    """
+
+    gates = dict((name, gate) for gate, name in _GATE_NAMES)
+    gates["CX"] = cq.CNOT
+    for op in ops:
+        if op[0] not in gates:
+            raise ValueError("no cirq gate for operation %r" % (op,))
+        yield gates[op[0]](*[cq.LineQubit(q) for q in op[1:]])
+
+def optimize_oracle(unitary_f, n_qubits):
+    """
+    Peephole optimize the oracle unitary_f on n_qubits qubits, print the
+    before/after report and return the optimized oracle as a circuit with
+    one moment per scheduled layer.
+    """
+
+    moments = djopt.report(to_ops(unitary_f), n_qubits)
+    return cq.Circuit([cq.Moment(from_ops(moment)) for moment in moments])
+
+#%%
+
+class DJTemplate:
+    """
+    The fixed prefix (work qubit and input H layer) and suffix (input H layer
+    and measurements) of the Deutsch-Jozsa circuit on length input bits.
+
+    The prefix is kept both as cirq moments and as the state it prepares;
+    the suffix is applied to simulated states as a Walsh-Hadamard transform.
+    With phase_oracle there is no work qubit and oracles must be phase
+    oracles on the input qubits.
+    """
+
+    def __init__(self, length, phase_oracle=False):
+        self.length = length
+        self.phase_oracle = phase_oracle
+        self.qubits = cq.LineQubit.range(length + (0 if phase_oracle else 1))
+
+        prefix = cq.Circuit()
+        if not phase_oracle:
+            prefix.append([cq.X(self.qubits[length]),
+                           cq.H(self.qubits[length])])
+        prefix.append([cq.H(q) for q in self.qubits[:length]])
+        self.prefix = list(prefix)
+
+        suffix = cq.Circuit()
+        suffix.append([cq.H(q) for q in self.qubits[:length]])
+        suffix.append([cq.MeasurementGate(key="q" + str(length-i))(q)
+                       for i, q in enumerate(self.qubits[:length])])
+        self.suffix = list(suffix)
+
+        self.initial = djsim.dj_initial_state(length, phase_oracle)
+        self.initial.setflags(write=False)
+
+    def circuit(self, unitary_f, strategy=cq.InsertStrategy.EARLIEST):
+        """
+        The complete Deutsch-Jozsa circuit with unitary_f spliced between the
+        cached prefix and suffix moments.
+        """
+
+        oracle = cq.Circuit()
+        oracle.append(unitary_f, strategy=strategy)
+        return cq.Circuit(self.prefix + list(oracle) + self.suffix)
+
+    def probabilities(self, unitary_f):
+        """
+        Exact measurement probabilities of the input register, high-order bit
+        first, starting from the cached prefix state.
+        """
+
+        state = djsim.simulate(to_ops(unitary_f), self.initial.copy())
+        djsim.wht(state, range(self.length))
+        return djsim.input_probabilities(state, self.length)
+
+    def verdict(self, unitary_f):
+        """
+        "constant" if the all zero outcome is certain, otherwise "balanced"
+        """
+
+        if np.isclose(self.probabilities(unitary_f)[0], 1):
+            return "constant"
+        return "balanced"
+
+    def sweep(self, oracles):
+        """
+        Verdicts for each oracle in an iterable of oracles
+        """
+
+        return [self.verdict(unitary_f) for unitary_f in oracles]
+
+@functools.lru_cache(maxsize=None)
+def dj_template(length, phase_oracle=False):
+    """
+    The shared DJTemplate for length input bits
+    """
+
+    return DJTemplate(length, phase_oracle)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo trajectory simulation of noisy Deutsch-Jozsa runs.
+
+A batch of trajectories is one state array with a leading batch axis.  After
+every gate each of its qubits independently suffers a random Pauli error with
+the depolarizing probability configured for that gate type.  Readout error
+flips each measured bit with a fixed probability.  Batches are seeded from a
+single SeedSequence and can be spread over worker processes.
+"""
+
+import concurrent.futures
+
+import numpy as np
+
+from . import djsim
+
+#%%
+
+# depolarizing probability per gate type; gates not listed are noiseless
+DEFAULT_CHANNELS = {"X": 1e-3, "Z": 1e-3, "H": 1e-3,
+                    "CNOT": 1e-2, "CZ": 1e-2, "CCX": 3e-2, "CCZ": 3e-2}
+
+def dj_ops(length, oracle_ops, phase_oracle=False):
+    """
+    Operation tuples of the whole Deutsch-Jozsa circuit (without the
+    measurements) around oracle_ops, with the work qubit at index length.
+    With phase_oracle there is no work qubit.
+    """
+
+    ops = [] if phase_oracle else [("X", length), ("H", length)]
+    ops.extend(("H", i) for i in range(length))
+    ops.extend(oracle_ops)
+    ops.extend(("H", i) for i in range(length))
+    return ops
+
+def depolarize(states, qubits, p, rng, n_qubits):
+    """
+    Independently for each trajectory in the batch and each qubit, apply X,
+    Y or Z with probability p/3 each.  Works in place.
+    """
+
+    for q in qubits:
+        u = rng.random(len(states))
+        for gate, hit in (("X", u < 2*p/3), ("Z", (u >= p/3) & (u < p))):
+            if hit.any():
+                picked = states[hit]
+                djsim.apply_gate(picked, gate, (q,), n_qubits)
+                states[hit] = picked
+    return states
+
+def readout_probabilities(probs, r, length):
+    """
+    Outcome probabilities of the length measured bits after each bit is
+    flipped with probability r.  probs has a leading batch axis.
+    """
+
+    probs = probs.reshape((len(probs),) + (2,)*length)
+    for axis in range(1, length + 1):
+        lo = np.take(probs, 0, axis=axis)
+        hi = np.take(probs, 1, axis=axis)
+        probs = np.stack(((1 - r)*lo + r*hi, r*lo + (1 - r)*hi), axis=axis)
+    return probs.reshape(len(probs), 2**length)
+
+#%%
+
+def _run_batch(args):
+    """
+    Success probability of each trajectory in one batch.  Takes a single
+    argument tuple so it can be mapped over a process pool.
+    """
+
+    ops, n_qubits, length, channels, readout, size, constant, seed = args
+    rng = np.random.default_rng(seed)
+    states = np.zeros((size,) + (2,)*n_qubits, dtype=np.complex128)
+    states[(slice(None),) + (0,)*n_qubits] = 1
+
+    for op in ops:
+        djsim.apply_op(states, op, n_qubits)
+        p = channels.get(op[0], 0) if isinstance(op[0], str) else 0
+        if p:
+            depolarize(states, op[1:], p, rng, n_qubits)
+
+    probs = djsim.input_probabilities(states, length, n_qubits)
+    p_zero = readout_probabilities(probs, readout, length)[:, 0]
+    return p_zero if constant else 1 - p_zero
+
+def success_rate(oracle_ops, length, channels=None, readout=0.0,
+                 trajectories=1024, batch=128, jobs=None, seed=None,
+                 phase_oracle=False):
+    """
+    Estimate the probability that Deutsch-Jozsa gives the right verdict for
+    oracle_ops on length input bits under the given noise.
+
+    Returns a dict with the estimate, its standard error and a convergence
+    list of (trajectories, estimate, standard error) after each batch.
+    jobs > 1 runs the batches on that many worker processes.  phase_oracle
+    runs without the work qubit, oracle_ops must then be a phase oracle.
+    """
+
+    if channels is None:
+        channels = DEFAULT_CHANNELS
+    ops = dj_ops(length, list(oracle_ops), phase_oracle)
+    n_qubits = length if phase_oracle else length + 1
+
+    # the noiseless run decides which verdict is the right one
+    ideal = djsim.simulate(ops, djsim.zero_state(n_qubits))
+    constant = np.isclose(djsim.input_probabilities(ideal, length)[0], 1)
+
+    sizes = [batch]*(trajectories // batch)
+    if trajectories % batch:
+        sizes.append(trajectories % batch)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(ops, n_qubits, length, dict(channels), readout, size, constant,
+              s) for size, s in zip(sizes, seeds)]
+
+    if jobs is not None and jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as pool:
+            results = list(pool.map(_run_batch, tasks))
+    else:
+        results = [_run_batch(task) for task in tasks]
+
+    convergence = []
+    total = np.concatenate(results) if results else np.zeros(0)
+    done = 0
+    for chunk in results:
+        done += len(chunk)
+        seen = total[:done]
+        stderr = seen.std(ddof=1)/np.sqrt(done) if done > 1 else np.inf
+        convergence.append((done, seen.mean(), stderr))
+
+    return {"success": convergence[-1][1], "stderr": convergence[-1][2],
+            "convergence": convergence}
+
+def report(oracle_ops, length, **kwargs):
+    """
+    Print how the success estimate converges as batches come in and return
+    the result of success_rate.
+    """
+
+    result = success_rate(oracle_ops, length, **kwargs)
+    print("%12s %10s %10s" % ("trajectories", "success", "stderr"))
+    for done, mean, stderr in result["convergence"]:
+        print("%12d %10.4f %10.4f" % (done, mean, stderr))
+    return result
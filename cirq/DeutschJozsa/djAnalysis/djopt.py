@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Peephole optimization of oracle circuits written as djsim operation tuples.
+
+The pipeline cancels adjacent inverse pairs, re-synthesizes runs of
+X/CNOT/CCX gates that toggle a single target qubit, and schedules what is
+left into as few moments as possible.  report prints gate counts, depth and
+the estimated number of amplitude updates a state vector simulator makes.
+"""
+
+import itertools
+
+import numpy as np
+
+from . import djsim
+
+#%%
+
+SELF_INVERSE = {"X", "Z", "H", "CNOT", "CX", "CZ", "CCX", "CCZ"}
+CLASSICAL = {"X": 0, "CNOT": 1, "CX": 1, "CCX": 2}
+SYMMETRIC = {"Z", "CZ", "CCZ"}
+
+# largest number of control qubits a merged run may depend on
+MAX_MERGE_CONTROLS = 10
+
+def _key(op):
+    """
+    Canonical form of an operation tuple for comparing two operations.
+    """
+
+    gate, qubits = op[0], op[1:]
+    if not isinstance(gate, str):
+        return None
+    if gate in SYMMETRIC:
+        return (gate, frozenset(qubits))
+    if gate in CLASSICAL:
+        return ("X", frozenset(qubits[:-1]), qubits[-1])
+    return (gate,) + qubits
+
+#%%
+
+def cancel_inverse_pairs(ops):
+    """
+    Remove pairs of identical self-inverse operations that have nothing
+    acting on their qubits in between.
+    """
+
+    result = []
+    for op in ops:
+        key = _key(op)
+        qubits = set(op[1:])
+        for i in range(len(result) - 1, -1, -1):
+            prev = result[i]
+            if prev is None or not qubits.intersection(prev[1:]):
+                continue
+            if (key is not None and op[0] in SELF_INVERSE
+                    and _key(prev) == key):
+                result[i] = None
+                op = None
+            break
+        if op is not None:
+            result.append(op)
+    return [op for op in result if op is not None]
+
+#%%
+
+def _classical_runs(ops):
+    """
+    Split ops into (target, run) pieces.  A run is a maximal stretch of
+    classical gates whose controlled gates all share one target that is never
+    used as a control; everything else is returned with a target of None.
+    """
+
+    run, target = [], None
+    for op in ops:
+        gate = op[0]
+        controls = CLASSICAL.get(gate) if isinstance(gate, str) else None
+        if controls == 0:
+            run.append(op)
+            continue
+        if (controls is not None and target in (None, op[-1])
+                and all(op[-1] not in r[1:-1] for r in run)):
+            target = op[-1]
+            run.append(op)
+            continue
+        if run:
+            yield target, run
+        run, target = [], None
+        if controls is None:
+            yield None, [op]
+        else:
+            run, target = [op], op[-1]
+    if run:
+        yield target, run
+
+def _anf(table):
+    """
+    Algebraic normal form (XOR of AND monomials) of a 0/1 truth table, as a
+    0/1 array indexed by monomial bitmask.
+    """
+
+    coeffs = np.array(table, dtype=np.uint8)
+    step = 1
+    while step < len(coeffs):
+        view = coeffs.reshape(-1, 2, step)
+        view[:, 1, :] ^= view[:, 0, :]
+        step *= 2
+    return coeffs
+
+def merge_classical(ops):
+    """
+    Replace each run of X/CNOT/CCX gates toggling one target by the X, CNOT
+    and CCX gates of the run's algebraic normal form, when that is smaller.
+    """
+
+    result = []
+    for target, run in _classical_runs(ops):
+        if target is None or len(run) < 2:
+            result.extend(run)
+            continue
+        controls = sorted({q for op in run for q in op[1:]} - {target})
+        if len(controls) > MAX_MERGE_CONTROLS:
+            result.extend(run)
+            continue
+        position = {q: i for i, q in enumerate(controls)}
+        table = []
+        flips = None
+        for bits in itertools.product((0, 1), repeat=len(controls)):
+            values = list(bits)
+            toggle = 0
+            for op in run:
+                if op[-1] == target:
+                    toggle ^= all(values[position[c]] for c in op[1:-1])
+                else:
+                    values[position[op[-1]]] ^= 1
+            table.append(toggle)
+            if flips is None:
+                flips = [v ^ b for v, b in zip(values, bits)]
+        # bitmask bit j (from the high end) is controls[j]
+        merged = []
+        width = len(controls)
+        for mask, coeff in enumerate(_anf(table)):
+            if not coeff:
+                continue
+            used = [controls[j] for j in range(width)
+                    if mask >> (width - 1 - j) & 1]
+            if len(used) > 2:
+                merged = None
+                break
+            merged.append((["X", "CNOT", "CCX"][len(used)],)
+                          + tuple(used) + (target,))
+        if merged is None:
+            result.extend(run)
+            continue
+        merged.extend(("X", q) for q, f in zip(controls, flips) if f)
+        result.extend(merged if len(merged) < len(run) else run)
+    return result
+
+#%%
+
+def schedule(ops):
+    """
+    Pack operations into moments, each as early as its qubits allow.
+    Returns a list of moments, each a list of operation tuples.
+    """
+
+    moments = []
+    ready = {}
+    for op in ops:
+        layer = max((ready.get(q, 0) for q in op[1:]), default=0)
+        if layer == len(moments):
+            moments.append([])
+        moments[layer].append(op)
+        for q in op[1:]:
+            ready[q] = layer + 1
+    return moments
+
+def optimize(ops):
+    """
+    Run the full pipeline until nothing changes.  Returns the optimized
+    operations scheduled into moments.
+    """
+
+    ops = list(ops)
+    while True:
+        new_ops = cancel_inverse_pairs(merge_classical(cancel_inverse_pairs(
+            ops)))
+        if len(new_ops) == len(ops):
+            break
+        ops = new_ops
+    return schedule(ops)
+
+#%%
+
+def simulation_cost(ops, n_qubits):
+    """
+    Estimated number of amplitude updates for a state vector simulation of
+    ops on n_qubits: each gate touches the amplitudes where its controls are
+    all 1.
+    """
+
+    cost = 0
+    for op in ops:
+        gate = op[0]
+        if isinstance(gate, str):
+            controls = djsim.CONTROLLED.get(gate, (0, gate))[0]
+            cost += 2**(n_qubits - controls)
+        else:
+            cost += 2**n_qubits * len(gate)
+    return cost
+
+def stats(moments, n_qubits):
+    """
+    Gate count, depth and estimated simulation cost of scheduled ops
+    """
+
+    ops = [op for moment in moments for op in moment]
+    return {"gates": len(ops), "depth": len(moments),
+            "cost": simulation_cost(ops, n_qubits)}
+
+def report(ops, n_qubits):
+    """
+    Optimize ops, print before/after gate count, depth and estimated
+    simulation cost, and return the optimized moments.
+    """
+
+    ops = list(ops)
+    before = stats(schedule(ops), n_qubits)
+    moments = optimize(ops)
+    after = stats(moments, n_qubits)
+    print("%-8s %8s %8s %12s" % ("", "gates", "depth", "cost"))
+    for name, row in (("before", before), ("after", after)):
+        print("%-8s %8d %8d %12d" % (name, row["gates"], row["depth"],
+                                     row["cost"]))
+    return moments
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-core shot sampling from one large outcome distribution.
+
+The distribution is written once into a multiprocessing.shared_memory block
+(straight from the state amplitudes, without an intermediate probability
+array) and every worker process maps the same block.  The shots are split
+over a fixed number of streams, each with its own generator spawned from a
+single SeedSequence.  A stream first splits its shots over chunks of
+CHUNK outcomes by their total probability, then draws each chunk's shots in
+order, collecting BLOCK outcomes at a time before adding them, under a
+lock, into a single shared row of counts.  Memory beyond the distribution
+is one row however many streams there are, plus a block per stream.  The
+counts therefore only depend on the seed and the number of streams, not on
+how many processes run them or on BLOCK.
+"""
+
+import concurrent.futures
+import contextlib
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# outcomes whose shots are drawn in one multinomial; part of the sampling
+CHUNK = 2**16
+
+# outcomes a stream collects before adding them to the shared counts
+BLOCK = 2**20
+
+# the lock guarding the shared counts in a worker process
+_LOCK = None
+
+#%%
+
+class SharedDistribution:
+    """
+    A normalized probability vector in shared memory.  Use as a context
+    manager, or call close() when done; the block is unlinked then.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._shm = shared_memory.SharedMemory(create=True, size=8*size)
+        self.name = self._shm.name
+        self.probabilities = np.ndarray((size,), np.float64, self._shm.buf)
+
+    @classmethod
+    def from_state(cls, state):
+        """ the outcome distribution |amplitude|^2 of state, in any shape """
+        amplitudes = np.reshape(state, -1)
+        dist = cls(amplitudes.size)
+        np.abs(amplitudes, out=dist.probabilities)
+        dist.probabilities **= 2
+        dist.probabilities /= dist.probabilities.sum()
+        return dist
+
+    @classmethod
+    def from_probabilities(cls, probabilities):
+        """ a copy of probabilities (not necessarily normalized) """
+        probabilities = np.reshape(probabilities, -1)
+        dist = cls(probabilities.size)
+        dist.probabilities[:] = probabilities
+        dist.probabilities /= dist.probabilities.sum()
+        return dist
+
+    def close(self):
+        del self.probabilities
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+#%%
+
+def _init_worker(lock):
+    global _LOCK
+    _LOCK = lock
+
+def _sample_stream(args):
+    """
+    Draw one stream's shots from the shared distribution, chunk by chunk,
+    and add them to the shared counts a block at a time; a single argument
+    for pool.map
+    """
+
+    dist_name, counts_name, size, shots, seed, chunk, block = args
+    dist = shared_memory.SharedMemory(name=dist_name)
+    out = shared_memory.SharedMemory(name=counts_name)
+    lock = contextlib.nullcontext() if _LOCK is None else _LOCK
+    # whole chunks per block
+    block = max(chunk, block - block % chunk)
+    try:
+        probabilities = np.ndarray((size,), np.float64, dist.buf)
+        counts = np.ndarray((size,), np.int64, out.buf)
+        rng = np.random.default_rng(seed)
+        masses = np.add.reduceat(probabilities, np.arange(0, size, chunk))
+        per_chunk = rng.multinomial(shots, masses/masses.sum())
+        part = None
+        for first in range(0, size, block):
+            last = min(first + block, size)
+            drawn = np.zeros(last - first, dtype=np.int64)
+            for start in range(first, last, chunk):
+                k = per_chunk[start // chunk]
+                if k == 0:
+                    continue
+                part = probabilities[start:start + chunk]
+                drawn[start - first:start - first + part.size] = \
+                    rng.multinomial(k, part/part.sum())
+            if per_chunk[first // chunk:(last - 1) // chunk + 1].any():
+                with lock:
+                    counts[first:last] += drawn
+        del probabilities, counts, part
+    finally:
+        dist.close()
+        out.close()
+
+def split_shots(shots, streams):
+    """ shots spread as evenly as possible over streams """
+    return [shots//streams + (i < shots % streams) for i in range(streams)]
+
+def sample_counts(dist, shots, streams=8, jobs=None, seed=None):
+    """
+    Counts of each outcome over shots draws from dist, a SharedDistribution
+    or anything SharedDistribution.from_state accepts.  The shots are drawn
+    in streams independent streams, run on jobs worker processes (all in
+    this process when jobs is None or 1).
+    """
+
+    owned = not isinstance(dist, SharedDistribution)
+    if owned:
+        dist = SharedDistribution.from_state(dist)
+    size = dist.size
+    out = shared_memory.SharedMemory(create=True, size=8*size)
+    try:
+        np.ndarray((size,), np.int64, out.buf)[:] = 0
+        seeds = np.random.SeedSequence(seed).spawn(streams)
+        tasks = [(dist.name, out.name, size, part, s, CHUNK, BLOCK)
+                 for part, s in zip(split_shots(shots, streams), seeds)]
+        if jobs is not None and jobs > 1:
+            with concurrent.futures.ProcessPoolExecutor(
+                    jobs, initializer=_init_worker,
+                    initargs=(multiprocessing.Lock(),)) as pool:
+                list(pool.map(_sample_stream, tasks))
+        else:
+            for task in tasks:
+                _sample_stream(task)
+        counts = np.ndarray((size,), np.int64, out.buf).copy()
+    finally:
+        out.close()
+        out.unlink()
+        if owned:
+            dist.close()
+    return counts
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""
+Small numpy state vector kernels for Deutsch-Jozsa style circuits.
+
+States are kept as tensors of shape (2,)*n so that qubit i is axis i.  The
+flattened index then has qubit 0 as the high-order bit, which matches the
+LineQubit ordering used by cirq.  Operations are tuples (gate, *qubits) where
+gate is either one of the names in GATES, a unitary matrix, a 1-d array
+holding the diagonal of a diagonal unitary, or a Permutation of basis states.
+
+simulate collects runs of classical reversible gates (X, CNOT and CCX) into a
+single Permutation so a run of any length costs one pass over the state.  A
+Permutation holds 2^m indices for the m qubits of its run, so runs are split
+to touch at most MAX_PERMUTATION_QUBITS qubits, and the permutations of
+recent runs are cached so simulating the same oracle again reuses them.
+"""
+
+import functools
+
+import numpy as np
+
+#%%
+
+H_GATE = (1/np.sqrt(2))*np.array([[1, 1], [1, -1]])
+
+GATES = {
+    "X": np.array([[0, 1], [1, 0]]),
+    "Z": np.array([[1, 0], [0, -1]]),
+    "H": H_GATE,
+}
+
+# gates that only permute computational basis states
+CLASSICAL = {"X", "CNOT", "CX", "CCX"}
+
+# the most qubits a compiled Permutation acts on (2^20 indices, 4 MiB)
+MAX_PERMUTATION_QUBITS = 20
+
+# controlled gates: name -> (number of controls, name of target gate)
+CONTROLLED = {
+    "CNOT": (1, "X"),
+    "CX": (1, "X"),
+    "CZ": (1, "Z"),
+    "CCX": (2, "X"),
+    "CCZ": (2, "Z"),
+}
+
+#%%
+
+def zero_state(n_qubits):
+    """
+    The all zero state |0...0> as an (2,)*n_qubits tensor
+    """
+
+    state = np.zeros((2,)*n_qubits, dtype=np.complex128)
+    state[(0,)*n_qubits] = 1
+    return state
+
+def _target_axis(n_qubits, controls, target):
+    """
+    Axis of the target qubit once the control axes have been indexed away.
+    Axes are counted from the end so a leading batch axis is allowed.
+    """
+
+    remaining = [q for q in range(n_qubits) if q not in controls]
+    return remaining.index(target) - len(remaining)
+
+def _controlled_view(state, n_qubits, controls):
+    """
+    View of the amplitudes where every control qubit is 1.
+    """
+
+    index = [Ellipsis] + [slice(None)]*n_qubits
+    for c in controls:
+        index[c - n_qubits] = 1
+    return state[tuple(index)]
+
+def apply_matrix(state, matrix, qubits, n_qubits=None):
+    """
+    Apply the unitary matrix to the given qubits of state, in place.  The
+    last n_qubits axes of state are qubits, any leading axes are a batch.
+    """
+
+    if n_qubits is None:
+        n_qubits = state.ndim
+    k = len(qubits)
+    axes = [q - n_qubits for q in qubits]
+    tensor = np.reshape(matrix, (2,)*(2*k))
+    moved = np.tensordot(tensor, state, axes=(list(range(k, 2*k)), axes))
+    state[...] = np.moveaxis(moved, list(range(k)), axes)
+    return state
+
+def apply_diagonal(state, diagonal, qubits, n_qubits=None):
+    """
+    Multiply state by the diagonal unitary with the given diagonal on the
+    given qubits, in place.  No matrix is ever formed.
+    """
+
+    if n_qubits is None:
+        n_qubits = state.ndim
+    axes = [q - n_qubits for q in qubits]
+    phases = np.reshape(diagonal, (2,)*len(qubits))
+    order = np.argsort(axes)
+    phases = np.transpose(phases, order)
+    shape = [1]*n_qubits
+    for q in qubits:
+        shape[q] = 2
+    state *= phases.reshape(shape)
+    return state
+
+def apply_gate(state, name, qubits, n_qubits=None):
+    """
+    Apply the named gate to the given qubits of state, in place.  X and Z
+    (and their controlled versions) are done with slicing rather than a
+    matrix product.
+    """
+
+    if n_qubits is None:
+        n_qubits = state.ndim
+    controls, base = CONTROLLED.get(name, (0, name))
+    if len(qubits) != controls + 1:
+        raise ValueError("gate %s expects %d qubits, got %d"
+                         % (name, controls + 1, len(qubits)))
+    view = _controlled_view(state, n_qubits, qubits[:-1])
+    axis = _target_axis(n_qubits, qubits[:-1], qubits[-1])
+    lo = np.take(view, 0, axis=axis)
+    hi = np.take(view, 1, axis=axis)
+    tail = [slice(None)]*(-axis - 1)
+    lo_view = view[tuple([Ellipsis, 0] + tail)]
+    hi_view = view[tuple([Ellipsis, 1] + tail)]
+
+    if base == "X":
+        lo_view[...] = hi
+        hi_view[...] = lo
+    elif base == "Z":
+        hi_view *= -1
+    elif base == "H":
+        lo_view[...] = (lo + hi)*H_GATE[0, 0]
+        hi_view[...] = (lo - hi)*H_GATE[0, 0]
+    else:
+        raise ValueError("unknown gate %s" % name)
+    return state
+
+#%%
+
+class Permutation:
+    """
+    A permutation of the computational basis states of some qubits.  source
+    holds, for every output basis state, the input basis state it comes from
+    (indices high-order qubit first, over the qubits it is applied to).
+    """
+
+    def __init__(self, source):
+        self.source = source
+
+def classical_permutation(ops, qubits):
+    """
+    The Permutation equal to the run of classical gates ops on qubits.  It
+    is found by applying the gates, in order, to an array of basis indices;
+    since each gate is its own inverse the result maps every output state to
+    the input state it comes from.
+    """
+
+    m = len(qubits)
+    local = dict((q, i) for i, q in enumerate(qubits))
+    dtype = np.int32 if m < 31 else np.int64
+    source = np.arange(2**m, dtype=dtype).reshape((2,)*m)
+    for op in ops:
+        apply_gate(source, op[0], tuple(local[q] for q in op[1:]), m)
+    return Permutation(source.reshape(-1))
+
+def apply_permutation(state, perm, qubits, n_qubits=None):
+    """
+    Apply a Permutation on the given qubits to state, in place, as a single
+    gather over the amplitudes.
+    """
+
+    if n_qubits is None:
+        n_qubits = state.ndim
+    k = len(qubits)
+    moved = np.moveaxis(state, [q - n_qubits for q in qubits],
+                        list(range(-k, 0)))
+    flat = moved.reshape(moved.shape[:moved.ndim - k] + (2**k,))
+    moved[...] = flat[..., perm.source].reshape(moved.shape)
+    return state
+
+def compile_ops(ops, min_run=2):
+    """
+    Replace every run of at least min_run consecutive classical gates in ops
+    with one Permutation operation on the qubits the run touches.
+    """
+
+    run = []
+    for op in ops:
+        if isinstance(op[0], str) and op[0] in CLASSICAL:
+            run.append(op)
+            continue
+        for compiled in _compile_run(run, min_run):
+            yield compiled
+        run = []
+        yield op
+    for compiled in _compile_run(run, min_run):
+        yield compiled
+
+@functools.lru_cache(maxsize=16)
+def _cached_permutation(run, qubits):
+    """ classical_permutation of a run given as a tuple, kept read only """
+    perm = classical_permutation(run, qubits)
+    perm.source.flags.writeable = False
+    return perm
+
+def _compile_run(run, min_run):
+    """
+    The operations for one run of classical gates, split into pieces that
+    touch at most MAX_PERMUTATION_QUBITS qubits each.
+    """
+
+    pieces, piece, touched = [], [], set()
+    for op in run:
+        qubits = touched.union(op[1:])
+        if piece and len(qubits) > MAX_PERMUTATION_QUBITS:
+            pieces.append(piece)
+            piece, qubits = [], set(op[1:])
+        piece.append(op)
+        touched = qubits
+    if piece:
+        pieces.append(piece)
+
+    ops = []
+    for piece in pieces:
+        if len(piece) < min_run:
+            ops.extend(piece)
+            continue
+        qubits = tuple(sorted(set(int(q) for op in piece for q in op[1:])))
+        key = tuple((op[0],) + tuple(int(q) for q in op[1:]) for op in piece)
+        ops.append((_cached_permutation(key, qubits),) + qubits)
+    return ops
+
+def apply_op(state, op, n_qubits=None):
+    """
+    Apply an operation tuple (gate, *qubits) to state, in place.
+    """
+
+    gate, qubits = op[0], op[1:]
+    if isinstance(gate, Permutation):
+        return apply_permutation(state, gate, qubits, n_qubits)
+    if isinstance(gate, str):
+        return apply_gate(state, gate, qubits, n_qubits)
+    if np.ndim(gate) == 1:
+        return apply_diagonal(state, gate, qubits, n_qubits)
+    return apply_matrix(state, gate, qubits, n_qubits)
+
+def simulate(ops, state, n_qubits=None):
+    """
+    Apply a sequence of operation tuples to state, in place.  Runs of
+    classical gates are applied as one permutation each.
+    """
+
+    for op in compile_ops(ops):
+        apply_op(state, op, n_qubits)
+    return state
+
+#%%
+
+def wht(state, qubits, n_qubits=None):
+    """
+    Walsh-Hadamard transform: H on every one of the given qubits, in place.
+    Each qubit is a single butterfly pass over the amplitudes.
+    """
+
+    if n_qubits is None:
+        n_qubits = state.ndim
+    scale = H_GATE[0, 0]
+    for q in qubits:
+        index = [Ellipsis] + [slice(None)]*n_qubits
+        index[q - n_qubits] = 0
+        lo = state[tuple(index)]
+        index[q - n_qubits] = 1
+        hi = state[tuple(index)]
+        lo_old = lo.copy()
+        lo += hi
+        hi *= -1
+        hi += lo_old
+        lo *= scale
+        hi *= scale
+    return state
+
+def dj_initial_state(length, phase_oracle=False):
+    """
+    The Deutsch-Jozsa state after the fixed prefix: H on every input qubit
+    and H|1> on the work qubit (qubit index length).  With phase_oracle there
+    is no work qubit and the state is the uniform superposition.
+    """
+
+    if phase_oracle:
+        return np.full((2,)*length, (1/np.sqrt(2))**length,
+                       dtype=np.complex128)
+    amp = (1/np.sqrt(2))**(length + 1)
+    state = np.full((2,)*(length + 1), amp, dtype=np.complex128)
+    state[..., 1] *= -1
+    return state
+
+def phase_ops(ops, work):
+    """
+    Rewrite an oracle that computes f into the work qubit by phase kickback
+    as an oracle acting only on the other qubits.  With the work qubit in
+    H|1>, a gate toggling it becomes a Z on its controls: X is a global phase
+    and is dropped, CNOT becomes Z and CCX becomes CZ.
+    """
+
+    phase = {"X": None, "CNOT": "Z", "CX": "Z", "CCX": "CZ"}
+    for op in ops:
+        if work not in op[1:]:
+            yield op
+        elif op[-1] == work and op[0] in phase:
+            if phase[op[0]] is not None:
+                yield (phase[op[0]],) + op[1:-1]
+        else:
+            raise ValueError("operation %r uses the work qubit other than as"
+                             " the target of X/CNOT/CCX" % (op,))
+
+def phase_diagonal(f, length):
+    """
+    The diagonal (-1)**f(x) of the phase oracle for f on length bits, with x
+    read high-order bit first.  f is called on an array of all inputs when it
+    accepts one, otherwise once per input.  A djtable.TruthTable for length
+    bits is unpacked directly.
+    """
+
+    if getattr(f, "n", None) == length and hasattr(f, "popcount"):
+        return np.where(f.values(), -1.0, 1.0)
+    inputs = np.arange(2**length)
+    try:
+        values = np.broadcast_to(np.asarray(f(inputs)), inputs.shape)
+    except (TypeError, ValueError):
+        values = np.array([f(x) for x in range(2**length)])
+    return np.where(np.asarray(values, dtype=bool), -1.0, 1.0)
+
+def input_probabilities(state, length, n_qubits=None):
+    """
+    Measurement probabilities of the first length qubits of state as a flat
+    array, high-order bit first.  Any remaining qubits are summed out.
+    """
+
+    if n_qubits is None:
+        n_qubits = state.ndim
+    probs = np.abs(state)**2
+    extra = tuple(range(length - n_qubits, 0))
+    if extra:
+        probs = probs.sum(axis=extra)
+    return probs.reshape(probs.shape[:probs.ndim - length] + (2**length,))
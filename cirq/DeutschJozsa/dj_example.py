@@ -10,34 +10,12 @@ is balanced.
 # pylint: disable=C0103
 
 import cirq as cq
+from djAnalysis.djhelp import (make_dj_circuit, dj_template, optimize_oracle,
+                               phase_oracle, to_phase_oracle)
 
 
 #%%
 
-def make_dj_circuit(length, unitary_f):
-    """ Given an iterable/generator of the circuit for the unitary operator
-    (unitary_f) of the boolean function f which operators on length bits,
-    construct and return the complete circuit for the Deutsch-Jozsa
-    algorithm """
-    # initialize the work space to H|1>
-    yield cq.X(cq.LineQubit(length))
-    yield cq.H(cq.LineQubit(length))
-
-    # H on 'input' space
-    for i in range(length):
-        yield cq.H(cq.LineQubit(i))
-    # Apply U_f
-    yield unitary_f
-    # H on 'input space
-    for i in range(length):
-        yield cq.H(cq.LineQubit(i))
-
-    # measure input space: all 0 = constant , !(all 0) = balanced
-    for i in range(length):
-        yield cq.MeasurementGate(key="q" + str(length-i))(cq.LineQubit(i))
-
-#%%
-
 
 # apply U_f: Here f is the balanced function f(x1_x_0) = x_1 = x_0.
 uf_bal = [cq.CCX(cq.LineQubit(0), cq.LineQubit(1), cq.LineQubit(2))]
@@ -45,6 +23,10 @@ uf_bal.extend([cq.X(cq.LineQubit(i)) for i in range(2)])
 uf_bal.append(cq.CCX(cq.LineQubit(0), cq.LineQubit(1), cq.LineQubit(2)))
 uf_bal.extend([cq.X(cq.LineQubit(i)) for i in range(2)])
 
+# the same oracle after peephole optimization: the X pairs and both
+# Toffolis reduce to two CNOTs and an X on the work qubit
+print(optimize_oracle(uf_bal, 3))
+
 circuit_bal = cq.Circuit()
 circuit_bal.append(make_dj_circuit(2, uf_bal))
 
@@ -88,3 +70,70 @@ sim = cq.google.XmonSimulator()
 result = sim.run(cir, repetitions=20)
 # view results..  should  be !(all zeros) because f is balanced
 print(result)
+
+
+#%%
+
+# The same two examples without the work qubit: the oracle is applied as a
+# phase on the input qubits, so the simulated state is half the size.
+circuit_phase = cq.Circuit()
+circuit_phase.append(make_dj_circuit(2, to_phase_oracle(uf_bal, 2),
+                                     phase_oracle=True))
+print(circuit_phase)
+
+# f(x) = x_5 as a phase oracle built straight from the function
+template = dj_template(8, phase_oracle=True)
+print(template.probabilities(phase_oracle(lambda x: (x >> 4) & 1, 8))[16])
+
+#%%
+
+# Sweep several oracles at n = 8.  The template for n = 8 is built once and
+# each oracle is spliced into it and simulated exactly.
+template = dj_template(8)
+oracles = [[cq.CNOT(cq.LineQubit(i), cq.LineQubit(8))] for i in range(8)]
+oracles.append([cq.X(cq.LineQubit(8))])
+print(template.sweep(oracles))
+print(template.circuit(oracles[0]))
+
+#%%
+
+# Success rate of the n = 8 example under the default depolarizing noise
+# and 1% readout error, from 2048 trajectories on 4 worker processes.  The
+# pool starts fresh interpreters on spawn platforms (Windows, macOS), which
+# import this script again, so the cell only runs in the main script.
+from djAnalysis import djnoise
+from djAnalysis.djhelp import to_ops
+
+if __name__ == "__main__":
+    noisy = djnoise.report(list(to_ops(uf)), 8, readout=0.01,
+                           trajectories=2048, batch=256, jobs=4)
+
+#%%
+
+# Query counts of the classical solvers against the single query of the
+# quantum circuit, for a few function families and input lengths.  The
+# classical solvers are in the top level python directory.  Give
+# write_table a path to save the table as CSV as well.
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "..", "python"))
+from djAnalysis import djcompare
+
+djcompare.write_table(djcompare.compare([3, 8, 12]))
+
+#%%
+
+# 10^8 shots of a 20 bit Deutsch-Jozsa run for the low bit function, drawn
+# from one shared copy of the distribution by 4 worker processes, guarded
+# like the noise cell.
+from djAnalysis import djsample, djsim
+
+if __name__ == "__main__":
+    state = djsim.dj_initial_state(20, phase_oracle=True)
+    djsim.apply_diagonal(state, djsim.phase_diagonal(lambda x: x & 1, 20),
+                         range(20))
+    djsim.wht(state, range(20))
+    shots = djsample.sample_counts(state, 10**8, jobs=4, seed=2018)
+    print(dict((int(i), int(shots[i])) for i in shots.nonzero()[0]))
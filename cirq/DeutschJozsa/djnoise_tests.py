@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the noisy Deutsch-Jozsa trajectories
+"""
+import numpy as np
+from djAnalysis import djnoise
+from djsim_tests import UF_BAL
+
+CONSTANT = [("X", 3)]
+BALANCED = [("CNOT", 0, 3), ("CNOT", 2, 3)]
+
+def test_noiseless():
+    for ops, length in ((CONSTANT, 3), (BALANCED, 3), (UF_BAL, 2)):
+        result = djnoise.success_rate(ops, length, channels={},
+                                      trajectories=64, batch=16, seed=1)
+        assert np.isclose(result["success"], 1.0)
+        assert [c[0] for c in result["convergence"]] == [16, 32, 48, 64]
+
+def test_readout_only():
+    for r in (0.01, 0.1, 0.3):
+        result = djnoise.success_rate(CONSTANT, 3, channels={}, readout=r,
+                                      trajectories=10, batch=4, seed=2)
+        assert np.isclose(result["success"], (1 - r)**3)
+
+def test_readout_probabilities():
+    probs = np.array([[1.0, 0, 0, 0], [0, 0.5, 0.5, 0]])
+    flipped = djnoise.readout_probabilities(probs, 0.1, 2)
+    assert np.allclose(flipped.sum(axis=1), 1)
+    assert np.allclose(flipped[0], [0.81, 0.09, 0.09, 0.01])
+
+def test_noisy():
+    result = djnoise.success_rate(CONSTANT, 3, channels={"H": 0.05},
+                                  trajectories=256, batch=64, seed=3)
+    assert 0.5 < result["success"] < 1.0
+    assert result["stderr"] > 0
+
+def test_jobs():
+    serial = djnoise.success_rate(UF_BAL, 2, readout=0.01,
+                                  trajectories=200, batch=32, seed=4)
+    pooled = djnoise.success_rate(UF_BAL, 2, readout=0.01,
+                                  trajectories=200, batch=32, seed=4, jobs=2)
+    assert serial["convergence"] == pooled["convergence"]
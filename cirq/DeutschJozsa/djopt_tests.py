@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the peephole optimizer of oracle circuits
+"""
+import numpy as np
+from djAnalysis import djopt, djsim
+from djsim_tests import UF_BAL, random_oracle
+
+def run(ops, n_qubits, seed=0):
+    rng = np.random.default_rng(seed)
+    state = (rng.normal(size=(2,)*n_qubits) +
+             1j*rng.normal(size=(2,)*n_qubits))
+    for op in ops:
+        djsim.apply_op(state, op)
+    return state
+
+def flat(moments):
+    return [op for moment in moments for op in moment]
+
+def test_uf_bal():
+    ops = flat(djopt.optimize(UF_BAL))
+    assert len(ops) == 3
+    assert np.allclose(run(ops, 3), run(UF_BAL, 3))
+
+def test_cancel_inverse_pairs():
+    assert djopt.cancel_inverse_pairs([("X", 0), ("H", 1), ("X", 0)]) == \
+        [("H", 1)]
+    assert djopt.cancel_inverse_pairs([("CZ", 0, 1), ("CZ", 1, 0)]) == []
+    assert djopt.cancel_inverse_pairs([("CCX", 0, 1, 2),
+                                       ("CCX", 1, 0, 2)]) == []
+    # anything on one of their qubits in between blocks the cancellation
+    for ops in ([("X", 0), ("H", 0), ("X", 0)],
+                [("CNOT", 0, 1), ("X", 1), ("CNOT", 0, 1)],
+                [("CNOT", 0, 1), ("H", 0), ("CNOT", 0, 1)],
+                [("CNOT", 0, 1), ("CNOT", 1, 0)]):
+        assert djopt.cancel_inverse_pairs(ops) == ops
+
+def test_merge_classical():
+    ops = [("CNOT", 0, 2), ("CNOT", 1, 2), ("CNOT", 0, 2)]
+    assert djopt.merge_classical(ops) == [("CNOT", 1, 2)]
+    # x0 x1 + x0 (1 + x1) = x0
+    ops = [("CCX", 0, 1, 2), ("X", 1), ("CCX", 0, 1, 2), ("X", 1)]
+    assert djopt.merge_classical(ops) == [("CNOT", 0, 2)]
+    # (1 + x0) x1 + x2 x1 = x1 + x0 x1 + x1 x2, one gate fewer
+    ops = [("X", 0), ("CCX", 0, 1, 3), ("X", 0), ("CCX", 2, 1, 3)]
+    assert djopt.merge_classical(ops) == [("CNOT", 1, 3), ("CCX", 1, 2, 3),
+                                          ("CCX", 0, 1, 3)]
+    # a run that is not made smaller is kept as it is
+    ops = [("CNOT", 0, 2), ("CNOT", 1, 2)]
+    assert djopt.merge_classical(ops) == ops
+    # runs whose targets differ are left alone
+    ops = [("CNOT", 0, 1), ("CNOT", 1, 2)]
+    assert djopt.merge_classical(ops) == ops
+
+def test_random_circuits():
+    rng = np.random.default_rng(27)
+    for n in (2, 3, 4):
+        for _ in range(30):
+            ops = random_oracle(n, 15, rng)
+            ops.insert(int(rng.integers(len(ops))),
+                       ("H", int(rng.integers(n))))
+            optimized = flat(djopt.optimize(ops))
+            assert len(optimized) <= len(ops)
+            assert np.allclose(run(optimized, n + 1), run(ops, n + 1))
+
+def test_schedule():
+    ops = [("H", 0), ("H", 1), ("CZ", 0, 1), ("X", 2), ("H", 1)]
+    assert djopt.schedule(ops) == [[("H", 0), ("H", 1), ("X", 2)],
+                                   [("CZ", 0, 1)], [("H", 1)]]
+    assert djopt.schedule([]) == []
+
+def test_report(capsys):
+    moments = djopt.report(UF_BAL, 3)
+    assert moments == djopt.optimize(UF_BAL)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].split()[:3] == ["before", "6", "4"]
+    assert lines[2].split()[:2] == ["after", "3"]
+    before = djopt.stats(djopt.schedule(UF_BAL), 3)
+    assert before["cost"] == 2*2**(3 - 2) + 4*2**3
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for sampling counts from a shared distribution
+"""
+import numpy as np
+from djAnalysis import djsample
+from djAnalysis.djsample import SharedDistribution
+
+def distribution(size, seed=0):
+    p = np.random.default_rng(seed).random(size)
+    p[::7] = 0
+    return p/p.sum()
+
+def test_total():
+    p = distribution(100)
+    for shots in (0, 1, 999, 10**5):
+        with SharedDistribution.from_probabilities(p) as dist:
+            counts = djsample.sample_counts(dist, shots, streams=3, seed=1)
+        assert counts.sum() == shots
+        assert not counts[p == 0].any()
+
+def test_jobs_and_block(monkeypatch):
+    p = distribution(50)
+    monkeypatch.setattr(djsample, "CHUNK", 4)
+    results = []
+    for block in (4, 8, 12, 13, 1000):
+        monkeypatch.setattr(djsample, "BLOCK", block)
+        for jobs in (None, 2):
+            with SharedDistribution.from_probabilities(p) as dist:
+                results.append(djsample.sample_counts(dist, 5000, streams=4,
+                                                      jobs=jobs, seed=2))
+    for counts in results[1:]:
+        assert np.array_equal(counts, results[0])
+
+def test_from_state():
+    p = distribution(64)
+    phases = np.exp(2j*np.pi*np.random.default_rng(3).random(p.size))
+    with SharedDistribution.from_probabilities(p) as dist:
+        from_p = djsample.sample_counts(dist, 10**4, seed=4)
+    with SharedDistribution.from_state(phases*np.sqrt(p)) as dist:
+        from_state = djsample.sample_counts(dist, 10**4, seed=4)
+    assert np.array_equal(from_p, from_state)
+    assert np.array_equal(djsample.sample_counts(np.sqrt(p), 10**4, seed=4),
+                          from_p)
+
+def test_frequencies():
+    p = distribution(16)
+    counts = djsample.sample_counts(np.sqrt(p), 10**6, seed=5)
+    assert np.allclose(counts/10**6, p, atol=3e-3)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the numpy Deutsch-Jozsa kernels: the phase kickback oracle must
+give the same input distribution as the oracle with a work qubit, and the
+compiled permutations the same state as applying the gates one by one
+"""
+import numpy as np
+from djAnalysis import djsim
+
+# uf_bal of dj_example.py: f(x1 x0) = x1 == x0 into work qubit 2
+UF_BAL = [("CCX", 0, 1, 2), ("X", 0), ("X", 1), ("CCX", 0, 1, 2),
+          ("X", 0), ("X", 1)]
+
+def ancilla_probabilities(ops, n):
+    state = djsim.dj_initial_state(n)
+    for op in ops:
+        djsim.apply_op(state, op)
+    djsim.wht(state, range(n))
+    return djsim.input_probabilities(state, n)
+
+def phase_probabilities(ops, n):
+    state = djsim.dj_initial_state(n, phase_oracle=True)
+    for op in djsim.phase_ops(ops, n):
+        djsim.apply_op(state, op)
+    djsim.wht(state, range(n))
+    return djsim.input_probabilities(state, n)
+
+def random_oracle(n, length, rng):
+    """
+    length random X, CNOT and CCX gates on n inputs and work qubit n, which
+    is only ever a target
+    """
+    ops = []
+    for _ in range(length):
+        target = int(rng.integers(n + 1))
+        controls = [int(q) for q in rng.permutation(n) if q != target]
+        kind = int(rng.integers(min(3, len(controls) + 1)))
+        ops.append((("X", "CNOT", "CCX")[kind],) +
+                   tuple(controls[:kind]) + (target,))
+    return ops
+
+def test_uf_bal():
+    ancilla = ancilla_probabilities(UF_BAL, 2)
+    assert np.allclose(ancilla, phase_probabilities(UF_BAL, 2))
+    assert np.isclose(ancilla[0], 0)
+
+def test_random_oracles():
+    rng = np.random.default_rng(2018)
+    for n in (2, 3, 4, 5):
+        for _ in range(20):
+            ops = random_oracle(n, 12, rng)
+            assert np.allclose(ancilla_probabilities(ops, n),
+                               phase_probabilities(ops, n))
+
+def test_compiled_runs():
+    rng = np.random.default_rng(30)
+    for n in (3, 5, 7):
+        ops = random_oracle(n, 30, rng)
+        ops[10:10] = [("H", 0)]
+        start = np.random.default_rng(n).normal(size=(2,)*(n + 1))
+        gatewise = start.astype(np.complex128)
+        for op in ops:
+            djsim.apply_op(gatewise, op)
+        compiled = djsim.simulate(ops, start.astype(np.complex128))
+        assert np.allclose(gatewise, compiled)
+        hits = djsim._cached_permutation.cache_info().hits
+        again = djsim.simulate(ops, start.astype(np.complex128))
+        assert np.allclose(gatewise, again)
+        assert djsim._cached_permutation.cache_info().hits > hits
+
+def test_compiled_runs_are_bounded(monkeypatch):
+    monkeypatch.setattr(djsim, "MAX_PERMUTATION_QUBITS", 3)
+    ops = [("CNOT", q, q + 1) for q in range(6)]
+    compiled = list(djsim.compile_ops(ops))
+    assert all(len(op) - 1 <= 3 for op in compiled)
+    start = np.random.default_rng(0).normal(size=(2,)*7)
+    gatewise = start.copy()
+    for op in ops:
+        djsim.apply_op(gatewise, op)
+    assert np.allclose(gatewise, djsim.simulate(ops, start.copy()))
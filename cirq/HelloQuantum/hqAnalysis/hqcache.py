@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+A content-addressed, size-bounded on-disk cache of simulation results.
+
+Results are keyed by a SHA-256 hash of the canonical form of the circuit
+together with the backend, number of repetitions and seed.  Each entry is an
+.npz file of named arrays (for example the exact distribution, sampled
+counts and the moment-step trace).  Reading an entry marks it as recently
+used; once the cache grows past max_bytes the least recently used entries
+are deleted.  Several processes may share a directory: an entry another
+process evicts in the meantime is simply treated as gone.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+#%%
+
+def _canonical(op):
+    """ JSON-able form of one gate tuple (name or matrix, *qubits) """
+    gate = op[0]
+    if not isinstance(gate, str):
+        array = np.ascontiguousarray(gate)
+        gate = {"dtype": str(array.dtype), "shape": list(array.shape),
+                "sha256": hashlib.sha256(array.tobytes()).hexdigest()}
+    return [gate] + [int(q) for q in op[1:]]
+
+def circuit_key(circuit, backend="numpy", repetitions=0, seed=None,
+                **extra):
+    """
+    The cache key of a circuit run.  circuit is a list of gate tuples, or
+    any other object (such as a cirq Circuit) whose repr describes it
+    fully.  Extra keyword arguments become part of the key.
+    """
+
+    if isinstance(circuit, (list, tuple)):
+        body = [_canonical(op) for op in circuit]
+    else:
+        body = repr(circuit)
+    text = json.dumps({"circuit": body, "backend": backend,
+                       "repetitions": repetitions, "seed": seed,
+                       "extra": extra}, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+#%%
+
+class ResultCache:
+    """
+    The cache in directory, holding at most max_bytes of entries.
+    """
+
+    def __init__(self, directory, max_bytes=256*2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".npz")
+
+    def _entries(self):
+        """ (last use, size, path) of every entry """
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".npz"):
+                    path = os.path.join(root, name)
+                    try:
+                        info = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((info.st_mtime, info.st_size, path))
+        return entries
+
+    def get(self, key):
+        """
+        The dict of arrays stored under key, or None
+        """
+
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                result = dict((name, data[name]) for name in data.files)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return result
+
+    def put(self, key, **arrays):
+        """
+        Store the named arrays under key, then evict down to max_bytes
+        """
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, tmp = tempfile.mkstemp(dir=os.path.dirname(path),
+                                       suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as out:
+                np.savez(out, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits
+        """
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def size(self):
+        """ total bytes of all entries """
+        return sum(size for _, size, _ in self._entries())
+
+    def cached(self, key, compute):
+        """
+        The entry for key, computing it with compute() (which returns a
+        dict of arrays) and storing it on a miss
+        """
+
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, **result)
+        return result
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Exact states for the X, Z, H and CZ circuits of the Hello Quantum puzzles.
+
+Every amplitude of a state reachable with those gates is 0 or
+i^phase / sqrt(2)^exponent, so a DyadicState keeps two small integer arrays
+instead of complex floats: phase (0..3, or -1 for a zero amplitude) and
+exponent.  Gates are applied exactly, equality and hashing compare the
+integers, and key() identifies a state up to a global phase.  to_numpy and
+from_numpy convert losslessly to and from the flat vectors of hqsim.
+"""
+
+import numpy as np
+
+ZERO = -1
+
+#%%
+
+class DyadicState:
+    """
+    A flat state of n qubits (qubit 0 the high-order bit) with amplitude j
+    equal to i^phase[j] / sqrt(2)^exponent[j], or 0 where phase[j] is -1
+    """
+
+    def __init__(self, phase, exponent):
+        self.phase = np.asarray(phase, dtype=np.int8)
+        self.exponent = np.where(self.phase == ZERO, 0,
+                                 exponent).astype(np.int8)
+        self.n_qubits = int(np.log2(len(self.phase)))
+
+    @classmethod
+    def zero(cls, n_qubits=2):
+        """ the state |0...0> """
+        phase = np.full(2**n_qubits, ZERO, dtype=np.int8)
+        phase[0] = 0
+        return cls(phase, np.zeros(2**n_qubits, dtype=np.int8))
+
+    @classmethod
+    def from_numpy(cls, state, atol=1e-9):
+        """
+        The exact form of a flat complex vector, or ValueError when some
+        amplitude is not of the form i^p/sqrt(2)^k
+        """
+
+        state = np.reshape(np.asarray(state, dtype=np.complex128), -1)
+        magnitude = np.abs(state)
+        nonzero = magnitude > atol
+        exponent = np.zeros(len(state), dtype=np.int64)
+        exponent[nonzero] = np.rint(-2*np.log2(magnitude[nonzero]))
+        phase = np.rint(np.angle(state)/(np.pi/2)).astype(np.int64) % 4
+        phase[~nonzero] = ZERO
+        exact = cls(phase, exponent)
+        if not np.allclose(exact.to_numpy(), state, rtol=0, atol=atol):
+            raise ValueError("state is not dyadic: %s" % state)
+        return exact
+
+    def to_numpy(self):
+        """ the state as a flat complex128 vector """
+        values = (1j**self.phase.astype(np.int64) *
+                  2.0**(-self.exponent.astype(np.float64)/2))
+        return np.where(self.phase == ZERO, 0, values).astype(np.complex128)
+
+    #%%
+
+    def _tensor(self, array):
+        return np.reshape(array, (2,)*self.n_qubits)
+
+    def apply(self, op):
+        """
+        The state after the gate tuple op ("X", "Z", "H" or "CZ" and its
+        qubits), as a new DyadicState
+        """
+
+        name, qubits = op[0], op[1:]
+        phase = self._tensor(self.phase).copy()
+        exponent = self._tensor(self.exponent).copy()
+        if name == "X":
+            phase = np.flip(phase, qubits[0])
+            exponent = np.flip(exponent, qubits[0])
+        elif name in ("Z", "CZ"):
+            index = [slice(None)]*self.n_qubits
+            for q in qubits:
+                index[q] = 1
+            flipped = phase[tuple(index)]
+            phase[tuple(index)] = np.where(flipped == ZERO, ZERO,
+                                           (flipped + 2) % 4)
+        elif name == "H":
+            phase, exponent = _hadamard(phase, exponent, qubits[0])
+        else:
+            raise ValueError("not an exact gate: %s" % name)
+        return DyadicState(phase.reshape(-1), exponent.reshape(-1))
+
+    def simulate(self, ops):
+        """ the state after all of ops """
+        state = self
+        for op in ops:
+            state = state.apply(op)
+        return state
+
+    #%%
+
+    def __eq__(self, other):
+        return (isinstance(other, DyadicState) and
+                np.array_equal(self.phase, other.phase) and
+                np.array_equal(self.exponent, other.exponent))
+
+    def __hash__(self):
+        return hash((self.phase.tobytes(), self.exponent.tobytes()))
+
+    def key(self):
+        """
+        Bytes that are equal exactly when two states are equal up to a
+        global phase: the first nonzero amplitude is rotated to phase 0
+        """
+
+        first = self.phase[np.flatnonzero(self.phase != ZERO)[0]]
+        phase = np.where(self.phase == ZERO, ZERO, (self.phase - first) % 4)
+        return phase.astype(np.int8).tobytes() + self.exponent.tobytes()
+
+    def __str__(self):
+        terms = []
+        for j in np.flatnonzero(self.phase != ZERO):
+            p, k = int(self.phase[j]), int(self.exponent[j])
+            scale = ("" if k == 0 else "/%d" % 2**(k//2) if k % 2 == 0
+                     else "/sqrt(%d)" % 2**k)
+            unit = "i" if p % 2 else "1" if scale else ""
+            terms.append("%s%s%s|%s>" % ("+" if p < 2 else "-", unit, scale,
+                                         np.binary_repr(j, self.n_qubits)))
+        return " ".join(terms) if terms else "0"
+
+    def __repr__(self):
+        return "DyadicState(%s)" % self
+
+def _hadamard(phase, exponent, qubit):
+    """
+    Exact Hadamard on qubit of tensor-shaped phase and exponent arrays:
+    (a +- b)/sqrt(2), defined when a and b have equal magnitudes and equal
+    or opposite phases, or one of them is zero
+    """
+
+    a_phase, b_phase = np.take(phase, 0, qubit), np.take(phase, 1, qubit)
+    a_exp, b_exp = np.take(exponent, 0, qubit), np.take(exponent, 1, qubit)
+    out_phase, out_exp = [], []
+    for sign in (0, 2):
+        # b scaled by +1 or -1
+        b = np.where(b_phase == ZERO, ZERO, (b_phase + sign) % 4)
+        new_phase = np.full(a_phase.shape, ZERO, dtype=np.int8)
+        new_exp = np.zeros(a_phase.shape, dtype=np.int8)
+
+        only_a = (a_phase != ZERO) & (b == ZERO)
+        only_b = (a_phase == ZERO) & (b != ZERO)
+        both = (a_phase != ZERO) & (b != ZERO)
+        if np.any(both & ((a_exp != b_exp) | ((a_phase - b) % 2 == 1))):
+            raise ValueError("Hadamard leaves the dyadic states")
+        same = both & (a_phase == b)
+
+        new_phase[only_a], new_exp[only_a] = a_phase[only_a], \
+            a_exp[only_a] + 1
+        new_phase[only_b], new_exp[only_b] = b[only_b], b_exp[only_b] + 1
+        # i^p/r + i^p/r = i^p*2/r, one sqrt(2) less after the 1/sqrt(2)
+        new_phase[same], new_exp[same] = a_phase[same], a_exp[same] - 1
+        out_phase.append(new_phase)
+        out_exp.append(new_exp)
+    return np.stack(out_phase, qubit), np.stack(out_exp, qubit)
+
+def simulate(ops, n_qubits=2):
+    """ the exact state after ops, starting from |0...0> """
+    return DyadicState.zero(n_qubits).simulate(ops)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar export and import of measurement records, counts and moment-step
+traces.
+
+A table is a directory holding one .npy file per column and a manifest.json
+naming the columns, their dtypes and shapes, the number of rows and any
+metadata.  Every column has one row per record (shot, outcome or step) and
+may have further fixed-size dimensions, such as the four amplitudes of a
+step.  load_table memory-maps the columns, so large tables can be filtered
+and aggregated with numpy without reading them into Python objects.
+
+When pyarrow is installed, save_parquet writes the same columns to a single
+Parquet file for tools outside numpy.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from . import hqhelp as hh
+from . import hqsim
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+#%%
+
+MANIFEST = "manifest.json"
+
+# the probability columns of a grid: name, function, number of values
+GRID = (("std_upper", hh.p_std_upper, 2), ("bell_upper", hh.p_bell_upper, 2),
+        ("std_lower", hh.p_std_lower, 2), ("bell_lower", hh.p_bell_lower, 2),
+        ("std_std", hh.p_std, 4), ("bell_bell", hh.p_bell, 4),
+        ("std_bell", hh.p_sb, 4), ("bell_std", hh.p_bs, 4))
+
+def save_table(path, columns, meta=None):
+    """
+    Write a dict of equal-length arrays as the table directory path
+    """
+
+    columns = dict((name, np.asarray(col)) for name, col in columns.items())
+    rows = set(len(col) for col in columns.values())
+    if len(rows) > 1:
+        raise ValueError("columns have different lengths: %s" % sorted(rows))
+    os.makedirs(path, exist_ok=True)
+    for name, col in columns.items():
+        np.save(os.path.join(path, name + ".npy"), col)
+    manifest = {"rows": rows.pop() if rows else 0,
+                "columns": dict((name, {"dtype": col.dtype.str,
+                                        "shape": list(col.shape[1:])})
+                                for name, col in columns.items()),
+                "meta": meta or {}}
+    with open(os.path.join(path, MANIFEST), "w") as out:
+        json.dump(manifest, out, indent=1, sort_keys=True)
+
+def read_manifest(path):
+    """ the manifest of the table at path """
+    with open(os.path.join(path, MANIFEST)) as manifest:
+        return json.load(manifest)
+
+def load_table(path, columns=None):
+    """
+    The columns of the table at path (all of them by default) as read-only
+    memory-mapped arrays
+    """
+
+    if columns is None:
+        columns = sorted(read_manifest(path)["columns"])
+    return dict((name, np.load(os.path.join(path, name + ".npy"),
+                               mmap_mode="r")) for name in columns)
+
+def save_parquet(path, columns, meta=None):
+    """
+    Write a dict of equal-length arrays to the Parquet file path.  Complex
+    columns are split into name_real and name_imag, and columns with extra
+    dimensions become fixed-size lists.  Needs pyarrow.
+    """
+
+    if pa is None:
+        raise ImportError("save_parquet needs pyarrow")
+    arrays = {}
+    for name, col in columns.items():
+        col = np.asarray(col)
+        parts = ([(name + "_real", col.real), (name + "_imag", col.imag)]
+                 if np.iscomplexobj(col) else [(name, col)])
+        for part, values in parts:
+            width = int(np.prod(values.shape[1:]))
+            flat = pa.array(np.ascontiguousarray(values).reshape(-1))
+            arrays[part] = (pa.FixedSizeListArray.from_arrays(flat, width)
+                            if values.ndim > 1 else flat)
+    table = pa.table(arrays)
+    if meta:
+        table = table.replace_schema_metadata({"meta": json.dumps(meta)})
+    pq.write_table(table, path)
+
+#%%
+
+def grid_columns(states):
+    """
+    The grid probability columns of a sequence of flat 2 qubit states
+    """
+
+    states = list(states)
+    return dict((name, np.array([func(s) for s in states], dtype=np.float64)
+                        .reshape(len(states), size))
+                for name, func, size in GRID)
+
+def trace_columns(ops, state=None):
+    """
+    The moment-step trace of ops as columns: step, gate name, qubits (-1
+    for unused), amplitudes and the grid probabilities.  Step 0 is the
+    starting state.
+    """
+
+    if state is None:
+        state = hqsim.zero_state()
+    states = [state] + list(hqsim.moment_steps(ops, state))
+    qubits = -np.ones((len(states), 2), dtype=np.int8)
+    for i, op in enumerate(ops, 1):
+        qubits[i, :len(op) - 1] = op[1:]
+    columns = {"step": np.arange(len(states), dtype=np.int32),
+               "gate": np.array([""] + [op[0] for op in ops], dtype="U4"),
+               "qubits": qubits,
+               "amplitudes": np.array(states, dtype=np.complex128)}
+    columns.update(grid_columns(states))
+    return columns
+
+def record_columns(state, repetitions, seed=None):
+    """
+    One row per shot of measuring state: the outcome index and the bit of
+    each qubit, keyed like hqsim.histograms
+    """
+
+    probs = np.abs(state)**2
+    rng = np.random.default_rng(seed)
+    outcome = rng.choice(len(probs), size=repetitions, p=probs/probs.sum())
+    n_qubits = int(np.log2(len(probs)))
+    columns = {"shot": np.arange(repetitions, dtype=np.int64),
+               "outcome": outcome.astype(np.int64)}
+    for i in range(n_qubits):
+        columns["q" + str(n_qubits-1-i)] = (
+            (outcome >> (n_qubits-1-i)) & 1).astype(np.uint8)
+    return columns
+
+def count_columns(records):
+    """ outcome and count columns aggregated from record columns """
+    outcome, count = np.unique(records["outcome"], return_counts=True)
+    return {"outcome": outcome, "count": count}
+
+def export_puzzle(directory, name, repetitions=1000, seed=None):
+    """
+    Write the trace, shot records and counts of a puzzle as the tables
+    directory/name/trace, records and counts.  Returns the puzzle directory.
+    """
+
+    from .hqpuzzles import puzzle_ops
+    ops = puzzle_ops(name)
+    meta = {"puzzle": name, "repetitions": repetitions, "seed": seed}
+    path = os.path.join(directory, name)
+    trace = trace_columns(ops)
+    records = record_columns(trace["amplitudes"][-1], repetitions, seed)
+    save_table(os.path.join(path, "trace"), trace, meta)
+    save_table(os.path.join(path, "records"), records, meta)
+    save_table(os.path.join(path, "counts"), count_columns(records), meta)
+    return path
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+The Hello Quantum grid for any number of qubits.
+
+For a chosen set of k qubits, basis_probabilities gives the outcome
+distribution of those qubits for every one of the 2^k ways of measuring
+each of them in the standard or Hadamard ("bell" in hqhelp) basis.  The
+Hadamards are applied one qubit at a time to a growing stack of tensors:
+the stack doubles at each qubit, holding the state with and without that
+Hadamard, so every intermediate transform is shared by all the basis
+combinations that contain it.  All 2^k combinations cost about twice a
+single pass over the stack instead of k times 2^k separate transforms.
+
+grid collects the distributions of several qubit subsets (every single
+qubit and every pair by default, the n qubit version of the 2 qubit grid),
+taking each subset inside a larger one as a marginal of the larger one's
+stack, and plot_grid draws them as rows of circles.  Bases are
+written "Z" (standard) and "X" (Hadamard), so for 2 qubits the combination
+"XZ" is p_bs of hqhelp and "ZX" is p_sb.
+"""
+
+import itertools
+
+import numpy as np
+
+#%%
+
+# stacked identity and Hadamard: BASIS[c] is the change to basis c
+BASIS = np.array([np.eye(2), np.array([[1, 1], [1, -1]])/np.sqrt(2)])
+
+def _stack(state, qubits, n_qubits):
+    """
+    The amplitude tensor for every basis choice on qubits: shape (2,)*k
+    (basis of qubits[0], ...) followed by the (2,)*n_qubits state axes
+    """
+
+    tensor = np.reshape(state, (2,)*n_qubits)
+    for i, q in enumerate(qubits):
+        # the new basis axis lands in front of the ones already made
+        moved = np.tensordot(BASIS, tensor, axes=([2], [i + q]))
+        tensor = np.moveaxis(np.moveaxis(moved, 1, i + 1 + q), 0, i)
+    return tensor
+
+def basis_probabilities(state, qubits=None, n_qubits=None):
+    """
+    Outcome distributions of qubits (all by default) in every standard and
+    Hadamard basis combination.  The result has shape (2,)*k + (2,)*k: the
+    basis of each qubit (0 standard, 1 Hadamard) then its outcome.
+    """
+
+    if n_qubits is None:
+        n_qubits = int(np.log2(np.size(state)))
+    qubits = list(range(n_qubits)) if qubits is None else list(qubits)
+    k = len(qubits)
+    probs = np.abs(_stack(state, qubits, n_qubits))**2
+    others = [k + q for q in range(n_qubits) if q not in qubits]
+    probs = probs.sum(axis=tuple(others))
+    # the outcome axes follow the qubit numbers; put them in qubits order
+    order = list(np.argsort(qubits))
+    return np.moveaxis(probs, [k + i for i in range(k)],
+                       [k + j for j in order])
+
+def _marginal(probs, qubits, subset):
+    """
+    The basis_probabilities of subset from those of qubits, a superset:
+    the other qubits measured in the standard basis and summed out
+    """
+
+    k, m = len(qubits), len(subset)
+    pos = [qubits.index(q) for q in subset]
+    rest = [i for i in range(k) if i not in pos]
+    index = tuple(0 if i in rest else slice(None) for i in range(k))
+    part = probs[index].sum(axis=tuple(m + i for i in rest))
+    # the remaining axes follow qubits order; put them in subset order
+    order = list(np.argsort(pos))
+    return np.moveaxis(part, list(range(2*m)), order + [m + j for j in order])
+
+def combination_name(bases):
+    """ "ZX" and so on for a tuple of basis indices """
+    return "".join("ZX"[b] for b in bases)
+
+#%%
+
+def default_subsets(n_qubits):
+    """ every single qubit, then every pair """
+    return ([(q,) for q in range(n_qubits)] +
+            list(itertools.combinations(range(n_qubits), 2)))
+
+def grid(state, subsets=None, n_qubits=None):
+    """
+    A dict from each qubit subset to {combination name: flat distribution}
+    over the Hadamard and standard bases of its qubits.  A stack is only
+    built for subsets that are not part of a larger one; the others are
+    marginals of it (by default the singles come from the pairs).
+    """
+
+    if n_qubits is None:
+        n_qubits = int(np.log2(np.size(state)))
+    if subsets is None:
+        subsets = default_subsets(n_qubits)
+    built = []
+    for subset in sorted(subsets, key=len, reverse=True):
+        if not any(set(subset) <= set(qubits) for qubits, _ in built):
+            built.append((list(subset),
+                          basis_probabilities(state, subset, n_qubits)))
+
+    result = {}
+    for subset in subsets:
+        qubits, probs = next((q, p) for q, p in built if set(subset) <= set(q))
+        part = _marginal(probs, qubits, list(subset))
+        result[tuple(subset)] = dict(
+            (combination_name(bases), np.reshape(part[bases], -1))
+            for bases in itertools.product((0, 1), repeat=len(subset)))
+    return result
+
+def expectation(distribution):
+    """
+    The circle value of a flat distribution: the expectation of (-1) to the
+    parity of the outcome, +1 white, -1 black, 0 grey
+    """
+
+    distribution = np.asarray(distribution)
+    parity = np.array([bin(i).count("1") % 2
+                       for i in range(len(distribution))])
+    return float(np.sum(distribution*(1 - 2*parity)))
+
+#%%
+
+def plot_grid(state, subsets=None, n_qubits=None, to_file=False, name=""):
+    """
+    Draw the grid as one row of circles per qubit subset and one column per
+    basis combination, shaded from white (+1) through grey to black (-1)
+    """
+    # imported here so the probability functions load without matplotlib
+    import matplotlib.pyplot as plt
+
+    values = grid(state, subsets, n_qubits)
+    rows = list(values)
+    width = max(len(values[row]) for row in rows)
+    fig, ax = plt.subplots(figsize=(1 + 0.6*width, 0.5 + 0.45*len(rows)))
+    for y, row in enumerate(rows):
+        for x, (label, dist) in enumerate(values[row].items()):
+            shade = (1 + expectation(dist))/2
+            ax.scatter(x, -y, s=300, c=[[shade]*3], edgecolors="k")
+            ax.annotate(label, (x, -y), xytext=(0, 12),
+                        textcoords="offset points", ha="center", fontsize=7)
+    ax.set_yticks([-y for y in range(len(rows))])
+    ax.set_yticklabels(["q" + ",".join(str(q) for q in row) for row in rows])
+    ax.set_xticks([])
+    ax.set_xlim(-0.6, width - 0.4)
+    ax.set_ylim(-len(rows) + 0.4, 0.7)
+    for side in ("top", "right", "bottom", "left"):
+        ax.spines[side].set_visible(False)
+    fig.tight_layout()
+    if to_file:
+        plt.savefig(name)
+    plt.show()
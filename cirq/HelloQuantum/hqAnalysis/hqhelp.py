@@ -7,7 +7,6 @@ Some useful functions for analyzing Hello Quantum Puzzles
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 #%%
 
@@ -152,6 +151,8 @@ def hq_grid(state, to_file=False, name=""):
     Plot probability distributions for the two qubit measurment outcomes
     Grid for Hello Quantum
     """
+    # imported here so the probability functions load without matplotlib
+    import matplotlib.pyplot as plt
 
     fig, ax = plt.subplots(2, 4, sharey=True, figsize=(10, 5))
     plt.subplots_adjust(right=1, left=.25)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental simulation for edit-and-rerun loops.
+
+PrefixCache keeps a trie of the circuits it has run.  Each node is one
+moment (a gate tuple, or a list of gate tuples applied together) below its
+parent, is keyed by a hash chained from its parent's key and the moment's
+canonical form (see hqcache.circuit_key), and holds the state after that
+moment.  Running a circuit walks down the trie as far as it matches and
+only simulates the remaining moments, so appending a gate or changing the
+last one costs one moment rather than the whole circuit.  Once more than
+max_states states are held the least recently used ones are dropped; the
+trie itself is kept, and a dropped state is simulated again on demand.
+
+The simulator is any function step(state, op) returning the new state
+without changing its input:
+
+    cache = PrefixCache(hqsim.apply, hqsim.zero_state())
+    cache = PrefixCache(lambda s, op: djsim.apply_op(s.copy(), op),
+                        djsim.zero_state(n))
+
+Cached states are returned read only; copy one before changing it.
+"""
+
+import collections
+import hashlib
+
+import numpy as np
+
+from . import hqsim
+from .hqcache import circuit_key
+
+#%%
+
+class _Node:
+    """ one moment of the trie """
+
+    def __init__(self, key, parent, depth):
+        self.key = key
+        self.parent = parent
+        self.depth = depth
+        self.children = {}
+        self.state = None
+
+class PrefixCache:
+    """
+    A prefix trie of simulated circuits starting from start, holding at
+    most max_states states besides the start
+    """
+
+    def __init__(self, step, start, max_states=1024):
+        self.step = step
+        self.max_states = max_states
+        self.root = _Node(circuit_key([]), None, 0)
+        self.root.state = self._freeze(np.array(start))
+        self._held = collections.OrderedDict()
+        self.simulated = 0
+
+    @staticmethod
+    def _freeze(state):
+        state = np.asarray(state)
+        state.flags.writeable = False
+        return state
+
+    @staticmethod
+    def moment_key(moment):
+        """ the canonical hash of a gate tuple or a list of them """
+        ops = moment if isinstance(moment, list) else [moment]
+        return circuit_key(ops)
+
+    def _apply(self, state, moment):
+        for op in (moment if isinstance(moment, list) else [moment]):
+            state = self.step(state, op)
+        self.simulated += 1
+        return state
+
+    def _hold(self, node, state):
+        node.state = self._freeze(state)
+        self._held[node.key] = node
+        self._held.move_to_end(node.key)
+        while len(self._held) > self.max_states:
+            _, old = self._held.popitem(last=False)
+            old.state = None
+
+    def _touch(self, node):
+        if node.key in self._held:
+            self._held.move_to_end(node.key)
+
+    #%%
+
+    def path(self, moments):
+        """
+        The trie nodes of moments, adding any that are missing
+        """
+
+        node, nodes = self.root, []
+        for moment in moments:
+            op_key = self.moment_key(moment)
+            child = node.children.get(op_key)
+            if child is None:
+                key = hashlib.sha256((node.key + op_key).encode()).hexdigest()
+                child = _Node(key, node, node.depth + 1)
+                node.children[op_key] = child
+            nodes.append(child)
+            node = child
+        return nodes
+
+    def _deepest(self, nodes):
+        """ index and state of the deepest node of nodes holding a state """
+        for i in reversed(range(len(nodes))):
+            if nodes[i].state is not None:
+                self._touch(nodes[i])
+                return i, nodes[i].state
+        return -1, self.root.state
+
+    def run(self, moments):
+        """
+        The state after moments, simulating only from the deepest cached
+        state on their path
+        """
+
+        moments = list(moments)
+        nodes = self.path(moments)
+        last, state = self._deepest(nodes)
+        for moment, node in zip(moments[last + 1:], nodes[last + 1:]):
+            self._hold(node, self._apply(state, moment))
+            state = node.state
+        return state
+
+    def states(self, moments):
+        """
+        The states after each of moments; dropped states before the deepest
+        cached one are simulated again
+        """
+
+        moments = list(moments)
+        self.run(moments)
+        state, result = self.root.state, []
+        for moment, node in zip(moments, self.path(moments)):
+            if node.state is None:
+                self._hold(node, self._apply(state, moment))
+            else:
+                self._touch(node)
+            state = node.state
+            result.append(state)
+        return result
+
+    def key(self, moments):
+        """ the prefix hash of moments """
+        nodes = self.path(list(moments))
+        return nodes[-1].key if nodes else self.root.key
+
+def puzzle_cache(n_qubits=2, max_states=1024):
+    """ a PrefixCache over hqsim starting from |0...0> """
+    return PrefixCache(hqsim.apply, hqsim.zero_state(n_qubits), max_states)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+The Hello Quantum puzzles of the hq_*.py scripts as plain data.
+
+Each puzzle has the gates that prepare its starting state ("init"), the
+gates of its solution ("solution") and any basis change made just before the
+final measurement ("measure").  Gates are tuples (name, *qubits) with qubit
+0 the high-order bit (top wire), as in the scripts.
+
+script_ops reads the same stages back out of a hq_*.py script, so the data
+here can be checked against the circuits the scripts actually build.
+"""
+
+import ast
+import os
+import re
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PUZZLES = {
+    "1_1": {
+        "init": [("X", 0)],
+        "solution": [("X", 0)],
+        "measure": [],
+    },
+    "1_2": {
+        "init": [("X", 1)],
+        "solution": [("X", 1)],
+        "measure": [],
+    },
+    "1_3": {
+        "init": [("X", 0), ("X", 1)],
+        "solution": [("X", 0), ("X", 1)],
+        "measure": [],
+    },
+    "1_4": {
+        "init": [("H", 1)],
+        "solution": [("H", 1)],
+        "measure": [],
+    },
+    "1_5": {
+        "init": [("H", 1), ("H", 0)],
+        "solution": [("H", 1), ("H", 0)],
+        "measure": [],
+    },
+    "1_6": {
+        "init": [("H", 0), ("Z", 0), ("H", 1)],
+        "solution": [("H", 0), ("Z", 0), ("H", 1)],
+        "measure": [],
+    },
+    "1_7": {
+        "init": [("H", 0), ("H", 1), ("Z", 0)],
+        "solution": [("Z", 0), ("H", 0), ("H", 1)],
+        "measure": [],
+    },
+    "1_8": {
+        "init": [("H", 0), ("H", 1), ("Z", 0), ("Z", 1)],
+        "solution": [("Z", 0), ("Z", 1), ("H", 0), ("H", 1)],
+        "measure": [],
+    },
+    "1_9": {
+        "init": [("X", 1)],
+        "solution": [("H", 1), ("Z", 1), ("H", 1)],
+        "measure": [],
+    },
+    "1_10": {
+        "init": [("X", 0), ("X", 1)],
+        "solution": [("H", 0), ("H", 1), ("Z", 0), ("Z", 1), ("H", 0),
+                     ("H", 1)],
+        "measure": [],
+    },
+    "2_1": {
+        "init": [("H", 0), ("X", 1)],
+        "solution": [("H", 0), ("X", 1)],
+        "measure": [],
+    },
+    "2_2": {
+        "init": [("X", 0), ("X", 1), ("H", 0)],
+        "solution": [("H", 0), ("X", 1)],
+        "measure": [],
+    },
+    "2_3": {
+        "init": [("X", 1), ("H", 0), ("H", 1)],
+        "solution": [("Z", 0), ("H", 0), ("H", 1)],
+        "measure": [],
+    },
+    "2_4": {
+        "init": [("H", 0)],
+        "solution": [("H", 0), ("H", 1), ("Z", 1), ("H", 1)],
+        "measure": [],
+    },
+    "3_1": {
+        "init": [("H", 0), ("X", 1)],
+        "solution": [("CZ", 0, 1)],
+        "measure": [],
+    },
+    "3_2": {
+        "init": [("X", 0), ("X", 1), ("H", 1)],
+        "solution": [("H", 0), ("H", 1), ("CZ", 0, 1), ("H", 0), ("H", 1)],
+        "measure": [],
+    },
+    "3_3": {
+        "init": [("H", 0), ("H", 1), ("Z", 0)],
+        "solution": [("CZ", 0, 1), ("Z", 0)],
+        "measure": [("H", 0)],
+    },
+    "3_4": {
+        "init": [("H", 1)],
+        "solution": [("H", 0), ("CZ", 0, 1)],
+        "measure": [],
+    },
+    "4_1": {
+        "init": [("X", 0), ("H", 1)],
+        "solution": [("X", 0), ("CZ", 0, 1), ("H", 1), ("X", 0)],
+        "measure": [],
+    },
+    "4_2": {
+        "init": [("X", 0), ("H", 0)],
+        "solution": [("X", 1), ("CZ", 0, 1), ("X", 1), ("H", 0)],
+        "measure": [],
+    },
+    "4_3": {
+        "init": [("X", 1)],
+        "solution": [("X", 0), ("H", 1), ("CZ", 0, 1), ("X", 0), ("H", 1)],
+        "measure": [],
+    },
+    "4_4": {
+        "init": [("X", 0)],
+        "solution": [("X", 1), ("H", 0), ("CZ", 0, 1), ("X", 1), ("H", 0)],
+        "measure": [],
+    },
+    "4_5": {
+        "init": [("X", 1), ("H", 0), ("H", 1)],
+        "solution": [("CZ", 0, 1)],
+        "measure": [],
+    },
+    "4_6": {
+        "init": [("X", 0), ("H", 0)],
+        "solution": [("H", 1), ("CZ", 0, 1)],
+        "measure": [],
+    },
+    "4_7": {
+        "init": [("X", 1), ("H", 0), ("H", 1), ("CZ", 0, 1)],
+        "solution": [("CZ", 0, 1), ("H", 0), ("H", 1)],
+        "measure": [],
+    },
+    "4_8": {
+        "init": [("X", 0), ("H", 0), ("H", 1), ("CZ", 0, 1)],
+        "solution": [("CZ", 0, 1), ("H", 1), ("H", 0)],
+        "measure": [],
+    },
+    "4_9": {
+        "init": [("H", 0), ("X", 1)],
+        "solution": [("CZ", 0, 1), ("H", 0), ("H", 1), ("CZ", 0, 1), ("H", 0),
+                     ("H", 1), ("CZ", 0, 1)],
+        "measure": [],
+    },
+}
+
+def puzzle_ops(name, stages=("init", "solution", "measure")):
+    """
+    The gates of the named puzzle for the given stages, in order
+    """
+
+    puzzle = PUZZLES[name]
+    return [op for stage in stages for op in puzzle[stage]]
+
+#%%
+
+class _Gates:
+    """
+    Stands in for the cirq module while a script's gate expressions are
+    evaluated: each gate call gives its tuple, a measurement gives None
+    """
+
+    def __getattr__(self, name):
+        return lambda *qubits: (name,) + qubits
+
+    @staticmethod
+    def MeasurementGate(key=None):
+        return lambda *qubits: None
+
+def _appended(node):
+    """ the argument of a top level circuit.append(...) statement, or None """
+    if (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call) and
+            isinstance(node.value.func, ast.Attribute) and
+            node.value.func.attr == "append" and
+            isinstance(node.value.func.value, ast.Name) and
+            node.value.func.value.id == "circuit"):
+        return node.value.args[0]
+    return None
+
+def script_ops(name, directory=SCRIPTS):
+    """
+    The stages of hq_<name>.py as PUZZLES holds them, from the gates its
+    circuit.append statements add.  The "solution to puzzle" and "finish
+    with" comments separate init, solution and measure; measurements are
+    left out.
+    """
+
+    path = os.path.join(directory, "hq_%s.py" % name)
+    with open(path) as src:
+        text = src.read()
+    lines = text.splitlines()
+    marks = []
+    for pattern in (r"#\s*solution", r"#\s*finish"):
+        found = [i + 1 for i, line in enumerate(lines)
+                 if re.match(r"\s*" + pattern, line, re.IGNORECASE)]
+        if not found:
+            raise ValueError("%s has no %r comment" % (path, pattern))
+        marks.append(found[0])
+
+    namespace = {"__builtins__": {"range": range, "str": str},
+                 "cq": _Gates(), "qubits": [0, 1]}
+    stages = {"init": [], "solution": [], "measure": []}
+    for node in ast.parse(text, path).body:
+        arg = _appended(node)
+        if arg is None:
+            continue
+        value = eval(compile(ast.Expression(arg), path, "eval"), namespace)
+        gates = value if isinstance(value, list) else [value]
+        stage = ("init" if node.lineno < marks[0] else
+                 "solution" if node.lineno < marks[1] else "measure")
+        stages[stage].extend(gate for gate in gates if gate is not None)
+    return stages
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+A small numpy simulator for the Hello Quantum circuits.
+
+Circuits are lists of gate tuples (name, *qubits) as in hqpuzzles, with
+qubit 0 the high-order bit.  States are flat numpy vectors in the same
+ordering as cirq's state(), so they can be handed straight to hqhelp.
+"""
+
+import numpy as np
+
+#%%
+
+GATES = {
+    "X": np.array([[0, 1], [1, 0]]),
+    "Z": np.array([[1, 0], [0, -1]]),
+    "H": (1/np.sqrt(2))*np.array([[1, 1], [1, -1]]),
+    "CZ": np.diag([1, 1, 1, -1]),
+    "CNOT": np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1],
+                      [0, 0, 1, 0]]),
+}
+
+def zero_state(n_qubits=2):
+    """
+    The state |0...0> as a flat vector
+    """
+
+    state = np.zeros(2**n_qubits, dtype=np.complex128)
+    state[0] = 1
+    return state
+
+def apply(state, op):
+    """
+    The state after the gate tuple op, as a new flat vector
+    """
+
+    n_qubits = int(np.log2(len(state)))
+    qubits = list(op[1:])
+    k = len(qubits)
+    gate = np.reshape(GATES[op[0]], (2,)*(2*k))
+    tensor = np.reshape(state, (2,)*n_qubits)
+    moved = np.tensordot(gate, tensor, axes=(list(range(k, 2*k)), qubits))
+    return np.moveaxis(moved, list(range(k)), qubits).reshape(-1)
+
+def moment_steps(ops, state=None, n_qubits=2):
+    """
+    Yield the state after each gate of ops, starting from state (|00> by
+    default)
+    """
+
+    if state is None:
+        state = zero_state(n_qubits)
+    for op in ops:
+        state = apply(state, op)
+        yield state
+
+def simulate(ops, state=None, n_qubits=2):
+    """
+    The final state after ops
+    """
+
+    if state is None:
+        state = zero_state(n_qubits)
+    for state in moment_steps(ops, state, n_qubits):
+        pass
+    return state
+
+#%%
+
+def sample(state, repetitions, seed=None):
+    """
+    Counts of each standard basis outcome over repetitions measurements of
+    state, as an array indexed like the state
+    """
+
+    probs = np.abs(state)**2
+    rng = np.random.default_rng(seed)
+    return rng.multinomial(repetitions, probs/probs.sum())
+
+def histograms(counts):
+    """
+    Per-qubit outcome counts in the form of cirq's result.histogram: key
+    "q" + str(n-1-i) for qubit i, each a dict {0: count, 1: count}
+    """
+
+    n_qubits = int(np.log2(len(counts)))
+    table = np.reshape(counts, (2,)*n_qubits)
+    hists = {}
+    for i in range(n_qubits):
+        others = tuple(a for a in range(n_qubits) if a != i)
+        marginal = table.sum(axis=others) if others else table
+        hists["q" + str(n_qubits-1-i)] = {0: int(marginal[0]),
+                                          1: int(marginal[1])}
+    return hists
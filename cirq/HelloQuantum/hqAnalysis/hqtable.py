@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+A precomputed table of every 2 qubit state the Hello Quantum moves reach.
+
+Starting from |00> and applying the moves X, Z and H on either qubit and CZ
+breadth first gives a small finite set of states (24 up to a global phase:
+these gates keep the amplitudes real, so the stabilizer states that need an
+i never appear).  For each state the table keeps its canonical key from
+hqexact, its exact amplitudes, the eight grid distributions of hqexport,
+its circle colours from hqverify, a shortest preparation from |00> and the
+state each move leads to.  Looking any of these up is a dict access instead
+of a simulation.
+
+The table ships as hqstates.json next to this module.  VERSION changes
+whenever the layout or the move set does; a file with another version is
+ignored and the table rebuilt.  Run this module to regenerate the file.
+"""
+
+import functools
+import json
+import os
+
+import numpy as np
+
+from . import hqexact
+
+VERSION = 1
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    "hqstates.json")
+MOVES = (("X", 0), ("X", 1), ("Z", 0), ("Z", 1), ("H", 0), ("H", 1),
+         ("CZ", 0, 1))
+
+#%%
+
+def build():
+    """
+    The table as a dict, by breadth first search from |00>
+    """
+
+    from .hqexport import GRID
+    from .hqverify import grid
+
+    start = hqexact.DyadicState.zero()
+    states, paths = [start], [[]]
+    index = {start.key(): 0}
+    neighbors = []
+    for i, state in enumerate(states):
+        row = []
+        for move in MOVES:
+            nxt = state.apply(move)
+            if nxt.key() not in index:
+                index[nxt.key()] = len(states)
+                states.append(nxt)
+                paths.append(paths[i] + [list(move)])
+            row.append(index[nxt.key()])
+        neighbors.append(row)
+
+    entries = []
+    for state, path, row in zip(states, paths, neighbors):
+        amplitudes = state.to_numpy()
+        entries.append({
+            "key": state.key().hex(),
+            "phase": state.phase.tolist(),
+            "exponent": state.exponent.tolist(),
+            "grids": dict((name, np.round(func(amplitudes), 12).tolist())
+                          for name, func, _ in GRID),
+            "circles": grid(state),
+            "path": path,
+            "neighbors": row,
+        })
+    return {"version": VERSION, "moves": [list(m) for m in MOVES],
+            "states": entries}
+
+def save(path=PATH):
+    """ rebuild the table and write it to path """
+    with open(path, "w") as out:
+        json.dump(build(), out, indent=1)
+
+#%%
+
+class StateTable:
+    """
+    Lookups in a table built by build().  Every method accepts a
+    DyadicState, a flat numpy state or a state index.
+    """
+
+    def __init__(self, data):
+        if data["version"] != VERSION:
+            raise ValueError("state table version %s, expected %d"
+                             % (data["version"], VERSION))
+        self.entries = data["states"]
+        self.moves = [tuple(m) for m in data["moves"]]
+        self._moves = dict((m, i) for i, m in enumerate(self.moves))
+        self._index = dict((bytes.fromhex(e["key"]), i)
+                           for i, e in enumerate(self.entries))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def index(self, state):
+        """ the index of state in the table, or KeyError """
+        if isinstance(state, (int, np.integer)):
+            return int(state)
+        if not isinstance(state, hqexact.DyadicState):
+            state = hqexact.DyadicState.from_numpy(state)
+        return self._index[state.key()]
+
+    def state(self, state):
+        """ the DyadicState of an entry """
+        entry = self.entries[self.index(state)]
+        return hqexact.DyadicState(entry["phase"], entry["exponent"])
+
+    def grids(self, state):
+        """ the eight grid distributions, by hqexport.GRID name """
+        return self.entries[self.index(state)]["grids"]
+
+    def circles(self, state):
+        """ the circle colours, as hqverify.grid gives them """
+        return self.entries[self.index(state)]["circles"]
+
+    def path(self, state):
+        """ a shortest list of moves that prepares state from |00> """
+        return [tuple(m) for m in self.entries[self.index(state)]["path"]]
+
+    def move(self, state, move):
+        """ the index of the state move leads to """
+        return self.entries[self.index(state)]["neighbors"][
+            self._moves[tuple(move)]]
+
+@functools.lru_cache(maxsize=None)
+def table(path=PATH):
+    """
+    The shipped table, rebuilt in memory when the file is missing or of
+    another version
+    """
+
+    try:
+        with open(path) as src:
+            return StateTable(json.load(src))
+    except (OSError, ValueError, KeyError):
+        return StateTable(build())
+
+if __name__ == "__main__":
+    save()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming state estimation from histograms in several measurement bases.
+
+A measurement setting gives each qubit a basis, "Z" (standard), "X"
+(Hadamard, like the H before the measurement of hq_3_3.py) or "Y".  A batch
+of shots in one setting is reduced at once to a count vector, and a Walsh
+transform of that vector gives, for every subset of the qubits, the sum of
+(-1)^parity over the batch: one term for each Pauli string made of the
+setting's bases on the subset and identities elsewhere.  Those sums and
+their shot numbers are all Tomography keeps, so memory does not grow with
+the number of shots and batches can arrive from a live run.
+
+Any time, expectations gives the estimate of every Pauli expectation,
+intervals a Wilson confidence interval for each, and density_matrix,
+physical and fidelity the linear inversion estimate of the state (through
+hqpauli) and what follows from it.
+"""
+
+import itertools
+
+import numpy as np
+
+from . import hqpauli
+
+#%%
+
+# basis change before a standard measurement, per basis
+ROTATIONS = {"Z": np.eye(2),
+             "X": np.array([[1, 1], [1, -1]])/np.sqrt(2),
+             "Y": np.array([[1, -1j], [1, 1j]])/np.sqrt(2)}
+
+def settings(n_qubits, bases="XYZ"):
+    """ every setting of n_qubits over bases, such as "ZX" """
+    return ["".join(s) for s in itertools.product(bases, repeat=n_qubits)]
+
+def measure(state, setting, shots, rng=None):
+    """
+    Counts of shots measurements of a flat state in setting, indexed like
+    the state (qubit 0 the high-order bit)
+    """
+
+    rng = np.random.default_rng(rng)
+    n_qubits = len(setting)
+    tensor = np.reshape(state, (2,)*n_qubits)
+    for q, basis in enumerate(setting):
+        tensor = np.moveaxis(np.tensordot(ROTATIONS[basis], tensor,
+                                          axes=([1], [q])), 0, q)
+    probs = np.abs(np.reshape(tensor, -1))**2
+    return rng.multinomial(shots, probs/probs.sum())
+
+def outcomes(measurements, n_qubits):
+    """
+    Outcome indices of each repetition from the measurements dict of a cirq
+    result with keys "q" + str(n-1-i) for qubit i, as in the puzzle scripts
+    """
+
+    index = 0
+    for i in range(n_qubits):
+        bits = np.asarray(measurements["q" + str(n_qubits-1-i)])
+        index = 2*index + np.reshape(bits, -1).astype(np.int64)
+    return index
+
+def _walsh(counts, n_qubits):
+    """
+    W[T] = sum over outcomes o of counts[o] (-1)^|o & T|, as a (2,)*n
+    tensor indexed by the subset T of qubits
+    """
+
+    tensor = np.reshape(np.asarray(counts, dtype=np.float64), (2,)*n_qubits)
+    walsh = np.array([[1, 1], [1, -1]])
+    for q in range(n_qubits):
+        tensor = np.moveaxis(np.tensordot(walsh, tensor, axes=([1], [q])),
+                             0, q)
+    return tensor
+
+#%%
+
+class Tomography:
+    """
+    Running Pauli expectation estimates for an n_qubits state
+    """
+
+    def __init__(self, n_qubits=2):
+        self.n_qubits = n_qubits
+        self.sums = np.zeros((4,)*n_qubits)
+        self.shots = np.zeros((4,)*n_qubits, dtype=np.int64)
+        self._targets = {}
+
+    def _target(self, setting):
+        """
+        For each subset T of qubits (a (2,)*n index), the index into the
+        (4,)*n Pauli tensor of the string it measures in setting
+        """
+
+        if setting not in self._targets:
+            codes = [hqpauli.PAULIS.index(b) for b in setting]
+            grids = np.meshgrid(*[[0, c] for c in codes], indexing="ij")
+            self._targets[setting] = tuple(grids)
+        return self._targets[setting]
+
+    def update(self, setting, counts):
+        """
+        Add a batch given as the count of each outcome in setting
+        """
+
+        if len(setting) != self.n_qubits:
+            raise ValueError("setting %r is not for %d qubits"
+                             % (setting, self.n_qubits))
+        target = self._target(setting)
+        # the subset T = {} is the identity, T = all qubits the full string
+        np.add.at(self.sums, target, _walsh(counts, self.n_qubits))
+        np.add.at(self.shots, target, int(np.sum(counts)))
+
+    def update_outcomes(self, setting, outcome):
+        """
+        Add a batch given as one outcome index per shot
+        """
+
+        self.update(setting, np.bincount(np.asarray(outcome, dtype=np.int64),
+                                         minlength=2**self.n_qubits))
+
+    #%%
+
+    def expectations(self):
+        """
+        The estimated Pauli spectrum, (4,)*n like hqpauli.spectrum, with 0
+        for strings no setting has measured yet
+        """
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(self.shots > 0, self.sums/self.shots, 0.0)
+        means[(0,)*self.n_qubits] = 1.0
+        return means
+
+    def intervals(self, z=1.96):
+        """
+        (low, high) Wilson score intervals for every Pauli expectation at
+        the normal quantile z; (-1, 1) for strings not measured yet
+        """
+
+        n = self.shots.astype(np.float64)
+        p = (1 + self.expectations())/2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centre = (p + z**2/(2*n))/(1 + z**2/n)
+            half = z*np.sqrt(p*(1 - p)/n + z**2/(4*n**2))/(1 + z**2/n)
+        low = np.where(n > 0, 2*(centre - half) - 1, -1.0)
+        high = np.where(n > 0, 2*(centre + half) - 1, 1.0)
+        identity = (0,)*self.n_qubits
+        low[identity], high[identity] = 1.0, 1.0
+        return np.clip(low, -1, 1), np.clip(high, -1, 1)
+
+    def density_matrix(self):
+        """ the linear inversion estimate, Hermitian with trace 1 """
+        return hqpauli.density_matrix(self.expectations(), self.n_qubits)
+
+    def physical(self):
+        """
+        The closest density matrix with no negative eigenvalues to the
+        linear inversion estimate (Smolin, Gambetta and Smith 2012)
+        """
+
+        values, vectors = np.linalg.eigh(self.density_matrix())
+        values = values[::-1].copy()
+        vectors = vectors[:, ::-1]
+        carry = 0.0
+        for i in reversed(range(len(values))):
+            if values[i] + carry/(i + 1) >= 0:
+                values[:i + 1] += carry/(i + 1)
+                break
+            carry += values[i]
+            values[i] = 0.0
+        return (vectors*values) @ np.conj(vectors.T)
+
+    def fidelity(self, state):
+        """ <state| rho |state> for the physical estimate rho """
+        state = np.reshape(state, -1)
+        return float(np.real(np.conj(state) @ self.physical() @ state))
+
+    def total_shots(self):
+        """ shots taken so far """
+        return int(self.shots[(0,)*self.n_qubits])
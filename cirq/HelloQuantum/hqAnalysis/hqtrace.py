@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Memory-mapped storage of moment-step traces.
+
+TraceRecorder streams the state after each moment into a file of fixed-size
+records, so step k starts at HEADER + k*stride and nothing but the current
+state is ever held in memory.  A sidecar index file (path + ".idx") keeps a
+short label per step, such as the gate that produced it.  Trace maps both
+files read only: indexing a step, diffs and overlaps between steps are
+served straight from disk, a block of amplitudes at a time.
+
+    with TraceRecorder("deep.trace", 20) as rec:
+        for label, state in steps:
+            rec.append(state, label)
+    trace = Trace.open("deep.trace")
+    trace[17], trace.diff(3, 4), trace.overlap(0, len(trace) - 1)
+"""
+
+import os
+
+import numpy as np
+
+from . import hqsim
+
+MAGIC = b"HQTR"
+VERSION = 1
+HEADER = 16
+LABEL = 32
+
+#%%
+
+class TraceRecorder:
+    """
+    Writes states of n_qubits qubits (flat vectors of 2**n_qubits
+    amplitudes, stored as dtype) to path.  Use as a context manager.
+    """
+
+    def __init__(self, path, n_qubits, dtype=np.complex128):
+        self.path = path
+        self.n_qubits = n_qubits
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.complex64, np.complex128):
+            raise ValueError("traces are complex64 or complex128, not %s"
+                             % self.dtype)
+        self.steps = 0
+        self._data = open(path, "wb")
+        self._data.write(MAGIC + bytes([VERSION, n_qubits,
+                                        self.dtype.itemsize]) +
+                         bytes(HEADER - len(MAGIC) - 3))
+        self._index = open(path + ".idx", "wb")
+
+    def append(self, state, label=""):
+        """
+        Write state as the next step
+        """
+
+        state = np.ascontiguousarray(np.reshape(state, -1), dtype=self.dtype)
+        if state.size != 2**self.n_qubits:
+            raise ValueError("expected %d amplitudes, got %d"
+                             % (2**self.n_qubits, state.size))
+        self._data.write(state.data)
+        self._index.write(label.encode("utf-8")[:LABEL].ljust(LABEL, b"\0"))
+        self.steps += 1
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def record(path, ops, state=None, n_qubits=2, dtype=np.complex128):
+    """
+    Simulate ops with hqsim, recording the starting state and the state
+    after every gate to path, labelled with the gate.  Returns the Trace.
+    """
+
+    if state is None:
+        state = hqsim.zero_state(n_qubits)
+    with TraceRecorder(path, n_qubits, dtype) as rec:
+        rec.append(state, "start")
+        for op, step in zip(ops, hqsim.moment_steps(ops, state, n_qubits)):
+            rec.append(step, " ".join(str(part) for part in op))
+    return Trace.open(path)
+
+#%%
+
+class Trace:
+    """
+    A recorded trace, read only.  trace[k] is the state of step k as a
+    memory-mapped flat vector.
+    """
+
+    def __init__(self, states, labels):
+        self.states = states
+        self.labels = labels
+        self.n_qubits = int(np.log2(states.shape[1]))
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory map a trace written by TraceRecorder
+        """
+
+        with open(path, "rb") as src:
+            header = src.read(HEADER)
+        if header[:len(MAGIC)] != MAGIC or header[len(MAGIC)] != VERSION:
+            raise ValueError("%s is not a version %d trace" % (path, VERSION))
+        n_qubits, itemsize = header[len(MAGIC) + 1], header[len(MAGIC) + 2]
+        dtype = {8: np.complex64, 16: np.complex128}[itemsize]
+        stride = itemsize * 2**n_qubits
+        # a step cut short by a crash is ignored
+        steps = (os.path.getsize(path) - HEADER) // stride
+        steps = min(steps, os.path.getsize(path + ".idx") // LABEL)
+        if steps == 0:
+            return cls(np.zeros((0, 2**n_qubits), dtype), [])
+        states = np.memmap(path, dtype=dtype, mode="r", offset=HEADER,
+                           shape=(steps, 2**n_qubits))
+        labels = np.memmap(path + ".idx", dtype="S%d" % LABEL, mode="r",
+                           shape=(steps,))
+        return cls(states, labels)
+
+    def __len__(self):
+        return len(self.states)
+
+    def __getitem__(self, k):
+        return self.states[k]
+
+    def label(self, k):
+        """ the label of step k """
+        return bytes(self.labels[k]).rstrip(b"\0").decode("utf-8")
+
+    def diff(self, j, k, atol=0.0, block=2**20):
+        """
+        (indices, change) of the amplitudes that differ by more than atol
+        between steps j and k, where change is trace[k] - trace[j] there
+        """
+
+        indices, changes = [], []
+        for start in range(0, self.states.shape[1], block):
+            delta = (np.asarray(self.states[k, start:start + block]) -
+                     self.states[j, start:start + block])
+            hit = np.flatnonzero(np.abs(delta) > atol)
+            indices.append(hit + start)
+            changes.append(delta[hit])
+        return np.concatenate(indices), np.concatenate(changes)
+
+    def overlap(self, j, k, block=2**20):
+        """
+        The inner product <trace[j]|trace[k]>
+        """
+
+        total = 0j
+        for start in range(0, self.states.shape[1], block):
+            total += np.vdot(self.states[j, start:start + block],
+                             self.states[k, start:start + block])
+        return total
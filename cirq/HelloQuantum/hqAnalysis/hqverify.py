@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Check that each puzzle solution reaches its target grid, exactly.
+
+A grid is written as 8 characters, one per circle, in the order of CIRCLES
+(the order hq.py prob prints them): the four single qubit circles, then the
+four two qubit circles.  A single qubit circle is white ("w") when that
+qubit certainly reads 0 in its basis and black ("b") when it certainly
+reads 1; a two qubit circle is white when the two readings certainly agree
+and black when they certainly differ.  Any other circle is grey ("g").  In
+a target "?" marks a circle the puzzle does not care about.
+
+The probabilities come from the exact DyadicState of hqexact as fractions,
+so no float tolerance is involved.
+
+The circuits checked are the ones the hq_*.py scripts build, read with
+hqpuzzles.script_ops, and verify also reports any script whose gates
+differ from hqpuzzles.PUZZLES, which the rest of hqAnalysis uses.
+
+TARGETS holds the game's target grid of each puzzle, to be transcribed
+from Hello Quantum itself: "w" or "b" for a circle the puzzle asks for and
+"?" for every other one, never "g".  Neither the game's grids nor any
+statement of the goals is part of this repository, and a target read off a
+solution (or guessed) would only check the solution against itself, so
+every entry is still "????????".  Such a puzzle is reported as untargeted
+with the grid its script reaches, ready to compare with the game; verify
+enforces an entry as soon as it has a "w" or "b".
+"""
+
+from fractions import Fraction
+
+from . import hqexact
+from .hqpuzzles import PUZZLES, script_ops
+
+#%%
+
+# circle name and the basis of the upper and lower qubit it reads (None when
+# the circle does not involve that qubit)
+CIRCLES = (("std upper", "Z", None), ("bell upper", "X", None),
+           ("std lower", None, "Z"), ("bell lower", None, "X"),
+           ("std/std", "Z", "Z"), ("bell/bell", "X", "X"),
+           ("std/bell", "Z", "X"), ("bell/std", "X", "Z"))
+
+# the game's target grids, not transcribed yet (see above)
+TARGETS = {
+    "1_1": "????????", "1_2": "????????", "1_3": "????????",
+    "1_4": "????????", "1_5": "????????", "1_6": "????????",
+    "1_7": "????????", "1_8": "????????", "1_9": "????????",
+    "1_10": "????????",
+    "2_1": "????????", "2_2": "????????", "2_3": "????????",
+    "2_4": "????????",
+    "3_1": "????????", "3_2": "????????", "3_3": "????????",
+    "3_4": "????????",
+    "4_1": "????????", "4_2": "????????", "4_3": "????????",
+    "4_4": "????????", "4_5": "????????", "4_6": "????????",
+    "4_7": "????????", "4_8": "????????", "4_9": "????????",
+}
+
+def targeted(target):
+    """ whether target asks for any circle """
+    return any(c in "wb" for c in target)
+
+def _probabilities(state, bases):
+    """
+    Exact outcome probabilities of state measured with qubit i in bases[i]
+    ("Z" or "X"), as a list of Fractions indexed like the state
+    """
+
+    for qubit, basis in enumerate(bases):
+        if basis == "X":
+            state = state.apply(("H", qubit))
+    # |i^p / sqrt(2)^k|^2 = 1 / 2^k
+    return [Fraction(0) if phase == hqexact.ZERO else Fraction(1, 2**k)
+            for phase, k in zip(state.phase.tolist(),
+                                state.exponent.tolist())]
+
+def circle_white(state, upper, lower):
+    """
+    The exact probability that the circle reading the upper and lower qubits
+    in those bases is white: reads 0, or both readings agree
+    """
+
+    probs = _probabilities(state, (upper or "Z", lower or "Z"))
+    white = []
+    for outcome, p in enumerate(probs):
+        bits = [outcome >> 1, outcome & 1]
+        parity = sum(b for b, basis in zip(bits, (upper, lower)) if basis)
+        if parity % 2 == 0:
+            white.append(p)
+    return sum(white, Fraction(0))
+
+def colour(white):
+    """ the colour of a circle that is white with probability white """
+    return "w" if white == 1 else "b" if white == 0 else "g"
+
+def grid(state):
+    """
+    The 8 character grid of a flat 2 qubit state (a DyadicState or a numpy
+    vector)
+    """
+
+    if not isinstance(state, hqexact.DyadicState):
+        state = hqexact.DyadicState.from_numpy(state)
+    return "".join(colour(circle_white(state, upper, lower))
+                   for _, upper, lower in CIRCLES)
+
+def mismatch(target, actual):
+    """
+    (circle name, target colour, actual colour) of the first circle where
+    actual breaks target, or None when it meets the target
+    """
+
+    for (name, _, _), want, got in zip(CIRCLES, target, actual):
+        if want != "?" and want != got:
+            return name, want, got
+    return None
+
+#%%
+
+def script_stages(name):
+    """
+    The stages ("init", "solution", "measure") in which the circuit of
+    hq_<name>.py differs from PUZZLES[name]
+    """
+
+    ops = script_ops(name)
+    return [stage for stage in ("init", "solution", "measure")
+            if ops[stage] != PUZZLES[name][stage]]
+
+def solved_grid(name):
+    """ the grid the circuit of hq_<name>.py reaches before measuring """
+    ops = script_ops(name)
+    return grid(hqexact.simulate(ops["init"] + ops["solution"]))
+
+def check(name, target=None):
+    """
+    (circle name, target colour, actual colour) of the first circle where
+    the solution of the named puzzle misses its target, or None
+    """
+
+    if target is None:
+        target = TARGETS[name]
+    if len(target) != len(CIRCLES) or set(target) - set("wb?"):
+        raise ValueError("target %r of puzzle %s is not %d of w, b or ?"
+                         % (target, name, len(CIRCLES)))
+    return mismatch(target, solved_grid(name))
+
+def verify(names=None):
+    """
+    Check the named puzzles (all by default); returns a dict from puzzle
+    name to (stages where the script differs from PUZZLES, mismatch or None,
+    or "untargeted" when the puzzle has no target)
+    """
+
+    if names is None:
+        names = list(PUZZLES)
+    return dict((name, (script_stages(name),
+                        check(name) if targeted(TARGETS[name])
+                        else "untargeted"))
+                for name in names)
+
+def report(names=None):
+    """
+    Print one line per puzzle and return True when every script matches
+    PUZZLES and every targeted puzzle passes
+    """
+
+    results = verify(names)
+    passed = True
+    for name, (stages, miss) in results.items():
+        if stages:
+            print("puzzle %-5s script differs from hqpuzzles in %s"
+                  % (name, ", ".join(stages)))
+            passed = False
+        if miss is None:
+            print("puzzle %-5s ok" % name)
+        elif miss == "untargeted":
+            print("puzzle %-5s no target transcribed, reaches %s"
+                  % (name, solved_grid(name)))
+        else:
+            print("puzzle %-5s MISMATCH at %s: target %s, got %s"
+                  % ((name,) + miss))
+            passed = False
+    return passed
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the on-disk result cache
+"""
+import os
+
+import numpy as np
+from hqAnalysis.hqcache import ResultCache, circuit_key
+
+def test_key_canonical():
+    ops = [("H", 0), ("CZ", 0, 1)]
+    assert circuit_key(ops) == circuit_key([("H", np.int64(0)),
+                                            ("CZ", 0, np.int32(1))])
+    assert circuit_key(ops) != circuit_key([("H", 1), ("CZ", 0, 1)])
+    assert circuit_key(ops) != circuit_key(ops, repetitions=10)
+    assert circuit_key(ops, seed=1) != circuit_key(ops, seed=2)
+    assert circuit_key(ops, n=2) != circuit_key(ops, n=3)
+
+def test_key_matrix():
+    x = np.array([[0, 1], [1, 0]])
+    assert circuit_key([(x, 0)]) == circuit_key([(x.copy(), 0)])
+    assert circuit_key([(x, 0)]) == circuit_key([(np.asfortranarray(x), 0)])
+    assert circuit_key([(x, 0)]) != circuit_key([(x.astype(float), 0)])
+    assert circuit_key([(x, 0)]) != circuit_key([(np.eye(2, dtype=int), 0)])
+
+def test_put_get(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = circuit_key([("X", 0)])
+    assert cache.get(key) is None
+    cache.put(key, counts=np.arange(4))
+    assert list(cache.get(key)["counts"]) == [0, 1, 2, 3]
+    cache.put(key, counts=np.zeros(2))
+    assert list(cache.get(key)["counts"]) == [0, 0]
+    files = [name for _, _, names in os.walk(str(tmp_path))
+             for name in names]
+    assert files == [key + ".npz"]
+
+def test_cached(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+    def compute():
+        calls.append(1)
+        return {"p": np.ones(3)}
+    key = circuit_key([("H", 0)])
+    assert list(cache.cached(key, compute)["p"]) == [1, 1, 1]
+    assert list(cache.cached(key, compute)["p"]) == [1, 1, 1]
+    assert len(calls) == 1
+
+def test_evict_lru(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=10**9)
+    keys = [circuit_key([("X", q)]) for q in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, data=np.zeros(1000))
+        os.utime(cache._path(key), (i, i))
+    # reading the oldest entry makes it the most recently used
+    assert cache.get(keys[0]) is not None
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+
+def test_missing_entries(tmp_path, monkeypatch):
+    # another process evicts entries while this one works with them
+    cache = ResultCache(str(tmp_path))
+    key = circuit_key([("Z", 0)])
+    cache.put(key, data=np.zeros(10))
+    real_remove = os.remove
+
+    def utime(path):
+        real_remove(path)
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(os, "utime", utime)
+    assert list(cache.get(key)["data"]) == [0]*10
+    assert cache.get(key) is None
+    monkeypatch.undo()
+
+    cache.put(key, data=np.ones(2))
+    real_walk = os.walk
+
+    def walk(top):
+        for root, dirs, files in real_walk(top):
+            yield root, dirs, files + ["gone.npz"]
+
+    def remove(path):
+        real_remove(path)
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(os, "walk", walk)
+    monkeypatch.setattr(os, "remove", remove)
+    assert cache.size() > 0
+    cache.max_bytes = 0
+    cache.evict()
+    assert cache.size() == 0
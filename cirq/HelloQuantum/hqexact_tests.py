@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the exact dyadic states against the float simulator
+"""
+import numpy as np
+import pytest
+from hqAnalysis import hqexact, hqsim
+from hqAnalysis.hqexact import DyadicState
+
+def random_ops(n_qubits, length, rng):
+    """ length random X, Z, H and CZ gates on n_qubits """
+    ops = []
+    for _ in range(length):
+        name = ("X", "Z", "H", "CZ")[rng.integers(4)]
+        count = 2 if name == "CZ" else 1
+        qubits = rng.permutation(n_qubits)[:count]
+        ops.append((name,) + tuple(int(q) for q in qubits))
+    return ops
+
+def test_apply_matches_hqsim():
+    rng = np.random.default_rng(44)
+    for n_qubits in (2, 3):
+        for _ in range(50):
+            ops = random_ops(n_qubits, 12, rng)
+            exact = DyadicState.zero(n_qubits)
+            state = hqsim.zero_state(n_qubits)
+            for op in ops:
+                exact = exact.apply(op)
+                state = hqsim.apply(state, op)
+                assert np.allclose(exact.to_numpy(), state)
+            assert hqexact.simulate(ops, n_qubits) == exact
+
+def test_round_trip():
+    rng = np.random.default_rng(45)
+    for _ in range(20):
+        exact = hqexact.simulate(random_ops(2, 10, rng))
+        assert DyadicState.from_numpy(exact.to_numpy()) == exact
+    state = np.array([1j, -1, 0, 1j])/2
+    assert np.allclose(DyadicState.from_numpy(state).to_numpy(), state)
+
+def test_not_dyadic():
+    with pytest.raises(ValueError):
+        DyadicState.from_numpy([np.sqrt(0.3), np.sqrt(0.7), 0, 0])
+    with pytest.raises(ValueError):
+        DyadicState.from_numpy(np.array([1, np.exp(0.25j*np.pi), 0, 0])
+                               / np.sqrt(2))
+
+def test_key_global_phase():
+    state = hqexact.simulate([("H", 0), ("CZ", 0, 1), ("H", 1)])
+    for phase in (1j, -1, -1j):
+        other = DyadicState.from_numpy(phase*state.to_numpy())
+        assert other != state
+        assert other.key() == state.key()
+    assert state.apply(("Z", 0)).key() != state.key()
+
+def test_eq_hash():
+    a = hqexact.simulate([("H", 0), ("H", 1)])
+    b = hqexact.simulate([("H", 1), ("H", 0)])
+    assert a == b and hash(a) == hash(b)
+    assert len(set([a, b, a.apply(("Z", 1))])) == 2
+    assert a != a.to_numpy()
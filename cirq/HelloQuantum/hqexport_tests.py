@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the columnar export of traces, records and counts
+"""
+import os
+
+import numpy as np
+import pytest
+from hqAnalysis import hqexport, hqsim
+from hqAnalysis.hqpuzzles import puzzle_ops
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "table")
+    columns = {"step": np.arange(5, dtype=np.int32),
+               "gate": np.array(["", "H", "CZ", "X", "H"], dtype="U4"),
+               "amplitudes": np.arange(20).reshape(5, 4)*(1 + 1j)}
+    hqexport.save_table(path, columns, meta={"puzzle": "1_1"})
+    loaded = hqexport.load_table(path)
+    assert sorted(loaded) == sorted(columns)
+    for name, col in columns.items():
+        assert loaded[name].dtype == col.dtype
+        assert np.array_equal(loaded[name], col)
+        assert isinstance(loaded[name], np.memmap)
+        assert not loaded[name].flags.writeable
+    assert sorted(hqexport.load_table(path, ["gate"])) == ["gate"]
+    manifest = hqexport.read_manifest(path)
+    assert manifest["rows"] == 5
+    assert manifest["meta"] == {"puzzle": "1_1"}
+    assert manifest["columns"]["amplitudes"]["shape"] == [4]
+    assert manifest["columns"]["step"]["shape"] == []
+
+def test_mismatched_lengths(tmp_path):
+    with pytest.raises(ValueError):
+        hqexport.save_table(str(tmp_path / "bad"),
+                            {"a": np.zeros(3), "b": np.zeros(4)})
+    assert not os.path.exists(str(tmp_path / "bad"))
+
+def test_export_puzzle(tmp_path):
+    path = hqexport.export_puzzle(str(tmp_path), "1_6", repetitions=500,
+                                  seed=1)
+    assert path == str(tmp_path / "1_6")
+    assert sorted(os.listdir(path)) == ["counts", "records", "trace"]
+    ops = puzzle_ops("1_6")
+    trace = hqexport.load_table(os.path.join(path, "trace"))
+    assert len(trace["step"]) == len(ops) + 1
+    assert list(trace["gate"][1:]) == [op[0] for op in ops]
+    assert np.allclose(trace["amplitudes"][-1], hqsim.simulate(ops))
+    assert np.allclose(trace["std_std"], np.abs(trace["amplitudes"])**2)
+    records = hqexport.load_table(os.path.join(path, "records"))
+    counts = hqexport.load_table(os.path.join(path, "counts"))
+    assert hqexport.read_manifest(os.path.join(path, "records"))["rows"] \
+        == 500
+    assert counts["count"].sum() == 500
+    assert np.array_equal(counts["count"],
+                          np.bincount(records["outcome"])[counts["outcome"]])
+    assert np.array_equal(records["q1"], records["outcome"] >> 1)
+    assert np.array_equal(records["q0"], records["outcome"] & 1)
+    for name in ("trace", "records", "counts"):
+        meta = hqexport.read_manifest(os.path.join(path, name))["meta"]
+        assert meta == {"puzzle": "1_6", "repetitions": 500, "seed": 1}
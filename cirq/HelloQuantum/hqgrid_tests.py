@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the n qubit grid against hqhelp and explicit Hadamards
+"""
+import itertools
+
+import numpy as np
+from hqAnalysis import hqgrid, hqsim
+from hqAnalysis import hqhelp as hh
+
+H = np.array([[1, 1], [1, -1]])/np.sqrt(2)
+
+def random_state(n_qubits, rng):
+    state = (rng.normal(size=2**n_qubits) +
+             1j*rng.normal(size=2**n_qubits))
+    return state/np.linalg.norm(state)
+
+def explicit(state, subset, bases, n_qubits):
+    """ Hadamards on the X qubits of subset, then the marginal of subset """
+    for q, b in zip(subset, bases):
+        if b:
+            op = np.kron(np.kron(np.eye(2**q), H), np.eye(2**(n_qubits-q-1)))
+            state = op.dot(state)
+    probs = np.reshape(np.abs(state)**2, (2,)*n_qubits)
+    others = tuple(q for q in range(n_qubits) if q not in subset)
+    marginal = probs.sum(axis=others)
+    # the marginal axes follow the qubit numbers; put them in subset order
+    return np.transpose(marginal, np.argsort(np.argsort(subset))).reshape(-1)
+
+def test_two_qubits():
+    rng = np.random.default_rng(47)
+    states = [random_state(2, rng) for _ in range(10)]
+    states.append(hqsim.simulate([("H", 0), ("CZ", 0, 1), ("H", 1)]))
+    for state in states:
+        values = hqgrid.grid(state)
+        assert sorted(values) == [(0,), (0, 1), (1,)]
+        pairs = values[(0, 1)]
+        for name, func in (("ZZ", hh.p_std), ("XX", hh.p_bell),
+                           ("ZX", hh.p_sb), ("XZ", hh.p_bs)):
+            assert np.allclose(pairs[name], func(state))
+        for name, func in (("Z", hh.p_std_upper), ("X", hh.p_bell_upper)):
+            assert np.allclose(values[(0,)][name], func(state))
+        for name, func in (("Z", hh.p_std_lower), ("X", hh.p_bell_lower)):
+            assert np.allclose(values[(1,)][name], func(state))
+
+def test_unsorted_subsets():
+    rng = np.random.default_rng(48)
+    for n_qubits, subsets in ((3, [(2, 0), (1,), (2, 0, 1)]),
+                              (4, [(3, 1), (1,), (2, 0, 3), (3,)])):
+        state = random_state(n_qubits, rng)
+        values = hqgrid.grid(state, subsets)
+        for subset in subsets:
+            for bases in itertools.product((0, 1), repeat=len(subset)):
+                name = hqgrid.combination_name(bases)
+                assert np.allclose(values[subset][name],
+                                   explicit(state, subset, bases, n_qubits))
+        probs = hqgrid.basis_probabilities(state, subsets[0])
+        k = len(subsets[0])
+        assert probs.shape == (2,)*(2*k)
+        assert np.allclose(probs.reshape(2**k, -1).sum(axis=1), 1)
+
+def test_expectation():
+    assert hqgrid.expectation([1, 0]) == 1
+    assert hqgrid.expectation([0, 0.5, 0.5, 0]) == -1
+    assert hqgrid.expectation([0.25]*4) == 0
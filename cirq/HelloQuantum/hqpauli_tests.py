@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the Pauli spectrum against explicit expectations and hqhelp
+"""
+import functools
+import itertools
+
+import numpy as np
+from hqAnalysis import hqpauli, hqsim
+from hqAnalysis import hqhelp as hh
+
+MATRICES = {"I": np.eye(2), "X": np.array([[0, 1], [1, 0]]),
+            "Y": np.array([[0, -1j], [1j, 0]]), "Z": np.diag([1, -1])}
+
+def random_state(n_qubits, rng):
+    state = (rng.normal(size=2**n_qubits) +
+             1j*rng.normal(size=2**n_qubits))
+    return state/np.linalg.norm(state)
+
+def test_spectrum_explicit():
+    rng = np.random.default_rng(48)
+    for n_qubits in (1, 2, 3):
+        state = random_state(n_qubits, rng)
+        spec = hqpauli.spectrum(state)
+        assert spec.shape == (4,)*n_qubits
+        for pauli in itertools.product(hqpauli.PAULIS, repeat=n_qubits):
+            op = functools.reduce(np.kron, [MATRICES[p] for p in pauli])
+            value = np.vdot(state, op.dot(state))
+            assert np.isclose(hqpauli.expectation(spec, pauli), value.real)
+
+def test_density_matrix():
+    rng = np.random.default_rng(49)
+    for n_qubits in (1, 2, 3):
+        state = random_state(n_qubits, rng)
+        rho = hqpauli.density_matrix(hqpauli.spectrum(state))
+        assert np.allclose(rho, np.outer(state, np.conj(state)))
+
+def test_batch():
+    rng = np.random.default_rng(50)
+    states = np.array([random_state(3, rng) for _ in range(5)])
+    spec = hqpauli.spectrum(states)
+    assert spec.shape == (5, 4, 4, 4)
+    for state, one in zip(states, spec):
+        assert np.allclose(hqpauli.spectrum(state), one)
+    rho = hqpauli.density_matrix(spec, n_qubits=3)
+    assert rho.shape == (5, 8, 8)
+    assert np.allclose(rho[2], np.outer(states[2], np.conj(states[2])))
+    assert hqpauli.distribution(spec, "XIZ").shape == (5, 4)
+
+def test_grid():
+    rng = np.random.default_rng(51)
+    states = [random_state(2, rng) for _ in range(10)]
+    states.append(hqsim.simulate([("H", 0), ("CZ", 0, 1), ("H", 1)]))
+    for state in states:
+        values = hqpauli.grid(hqpauli.spectrum(state))
+        assert sorted(values) == sorted(hqpauli.DERIVED)
+        for name, probs in values.items():
+            assert np.allclose(probs, getattr(hh, name)(state)), name
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the prefix cache of simulated circuits
+"""
+import numpy as np
+from hqAnalysis import hqprefix, hqsim
+
+def random_ops(length, rng, n_qubits=2):
+    ops = []
+    for _ in range(length):
+        name = ("X", "Z", "H", "CZ")[rng.integers(4)]
+        count = 2 if name == "CZ" else 1
+        ops.append((name,) + tuple(int(q) for q in
+                                   rng.permutation(n_qubits)[:count]))
+    return ops
+
+def test_incremental():
+    rng = np.random.default_rng(50)
+    cache = hqprefix.puzzle_cache()
+    ops = random_ops(10, rng)
+    assert np.allclose(cache.run(ops), hqsim.simulate(ops))
+    assert cache.simulated == 10
+    for _ in range(20):
+        # append a gate, then replace it with a different one
+        before = cache.simulated
+        ops = ops + random_ops(1, rng)
+        assert np.allclose(cache.run(ops), hqsim.simulate(ops))
+        assert cache.simulated == before + 1
+        other = ops[-1]
+        while other == ops[-1]:
+            other = random_ops(1, rng)[0]
+        ops = ops[:-1] + [other]
+        assert np.allclose(cache.run(ops), hqsim.simulate(ops))
+        assert cache.simulated == before + 2
+    # rerunning or going back to a prefix simulates nothing
+    before = cache.simulated
+    cache.run(ops)
+    cache.run(ops[:5])
+    assert cache.simulated == before
+
+def test_eviction():
+    rng = np.random.default_rng(51)
+    cache = hqprefix.puzzle_cache(max_states=3)
+    circuits = [random_ops(8, rng) for _ in range(5)]
+    for _ in range(2):
+        for ops in circuits:
+            assert np.allclose(cache.run(ops), hqsim.simulate(ops))
+            states = cache.states(ops)
+            assert len(states) == len(ops)
+            for state, step in zip(states, hqsim.moment_steps(ops)):
+                assert np.allclose(state, step)
+            assert len(cache._held) <= 3
+    assert not cache.run(circuits[0]).flags.writeable
+
+def test_moments_and_keys():
+    cache = hqprefix.puzzle_cache()
+    moment = [("H", 0), ("H", 1)]
+    assert np.allclose(cache.run([moment, ("CZ", 0, 1)]),
+                       hqsim.simulate(moment + [("CZ", 0, 1)]))
+    assert cache.simulated == 2
+    assert cache.key([("H", 0)]) != cache.key([("H", 1)])
+    assert cache.key([("H", 0), ("X", 1)]) != cache.key([("X", 1), ("H", 0)])
+    assert cache.key([]) == cache.root.key
+    # equal moments share one node
+    assert cache.path([("H", 0)])[0] is cache.path([("H", np.int64(0))])[0]
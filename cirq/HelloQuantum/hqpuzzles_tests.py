@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Tests that the puzzle data matches the hq_*.py scripts and that the
+verifier checks those circuits against the targets
+"""
+import numpy as np
+import pytest
+from hqAnalysis import hqverify
+from hqAnalysis.hqpuzzles import PUZZLES, script_ops
+
+def test_scripts_match_puzzles():
+    for name in PUZZLES:
+        assert script_ops(name) == PUZZLES[name], name
+
+def test_verify_all():
+    results = hqverify.verify()
+    assert sorted(results) == sorted(PUZZLES)
+    for name, (stages, miss) in results.items():
+        assert stages == [] and miss in (None, "untargeted"), name
+    assert hqverify.report()
+
+def test_targets():
+    assert sorted(hqverify.TARGETS) == sorted(PUZZLES)
+    for target in hqverify.TARGETS.values():
+        assert len(target) == 8 and set(target) <= set("wb?")
+
+def test_grid():
+    assert hqverify.grid(np.array([1, 0, 0, 0])) == "wgwgwggg"
+    assert hqverify.grid(np.array([0, 1, 1, 0])/np.sqrt(2)) == "ggggbwgg"
+
+def test_check():
+    assert hqverify.check("1_6", "????????") is None
+    assert hqverify.check("1_6", "b?w?b???") is None
+    assert hqverify.check("1_6", "w???????") == ("std upper", "w", "b")
+    with pytest.raises(ValueError):
+        hqverify.check("1_6", "g???????")
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the streaming tomography estimates
+"""
+import numpy as np
+from hqAnalysis import hqpauli, hqtomo
+from hqAnalysis.hqtomo import Tomography
+
+def random_state(n_qubits, rng):
+    state = (rng.normal(size=2**n_qubits) +
+             1j*rng.normal(size=2**n_qubits))
+    return state/np.linalg.norm(state)
+
+def test_measure():
+    bell = np.array([1, 0, 0, 1])/np.sqrt(2)
+    for setting in ("ZZ", "XX"):
+        counts = hqtomo.measure(bell, setting, 100, rng=1)
+        assert counts.sum() == 100 and counts[[1, 2]].sum() == 0
+    assert hqtomo.measure(bell, "YY", 100, rng=1)[[0, 3]].sum() == 0
+    # |0> + i|1> is an eigenstate of Y
+    assert list(hqtomo.measure(np.array([1, 1j])/np.sqrt(2), "Y", 10)) == \
+        [10, 0]
+
+def test_converges():
+    rng = np.random.default_rng(49)
+    for n_qubits in (1, 2, 3):
+        state = random_state(n_qubits, rng)
+        tomo = Tomography(n_qubits)
+        for setting in hqtomo.settings(n_qubits):
+            for _ in range(4):
+                tomo.update(setting,
+                            hqtomo.measure(state, setting, 25000, rng))
+        error = np.abs(tomo.expectations() - hqpauli.spectrum(state))
+        assert error.max() < 0.03
+        low, high = tomo.intervals()
+        inside = (low <= hqpauli.spectrum(state) + 1e-12) & \
+            (hqpauli.spectrum(state) - 1e-12 <= high)
+        assert inside.mean() > 0.85
+        assert tomo.fidelity(state) > 0.97
+        assert tomo.total_shots() == 10**5*3**n_qubits
+
+def test_physical():
+    rng = np.random.default_rng(50)
+    for n_qubits in (1, 2, 3):
+        state = random_state(n_qubits, rng)
+        tomo = Tomography(n_qubits)
+        # few shots leave the linear inversion estimate unphysical
+        for setting in hqtomo.settings(n_qubits):
+            tomo.update(setting, hqtomo.measure(state, setting, 3, rng))
+        rho = tomo.physical()
+        assert np.allclose(rho, np.conj(rho.T))
+        assert np.isclose(np.trace(rho).real, 1)
+        assert np.linalg.eigvalsh(rho).min() > -1e-12
+    assert np.linalg.eigvalsh(tomo.density_matrix()).min() < 0
+
+def test_update_outcomes():
+    rng = np.random.default_rng(51)
+    state = random_state(2, rng)
+    by_counts, by_outcomes = Tomography(2), Tomography(2)
+    for setting in hqtomo.settings(2):
+        counts = hqtomo.measure(state, setting, 200, rng)
+        outcome = rng.permutation(np.repeat(np.arange(4), counts))
+        measurements = {"q1": outcome >> 1, "q0": outcome & 1}
+        assert np.array_equal(hqtomo.outcomes(measurements, 2), outcome)
+        by_counts.update(setting, counts)
+        by_outcomes.update_outcomes(setting, outcome)
+    assert np.array_equal(by_counts.sums, by_outcomes.sums)
+    assert np.array_equal(by_counts.shots, by_outcomes.shots)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the memory-mapped moment-step traces
+"""
+import os
+
+import numpy as np
+import pytest
+from hqAnalysis import hqsim, hqtrace
+from hqAnalysis.hqtrace import Trace, TraceRecorder
+
+OPS = [("H", 0), ("CZ", 0, 1), ("H", 1), ("X", 2), ("H", 2), ("Z", 0)]
+
+def test_record_matches_hqsim(tmp_path):
+    path = str(tmp_path / "ops.trace")
+    for dtype in (np.complex128, np.complex64):
+        trace = hqtrace.record(path, OPS, n_qubits=3, dtype=dtype)
+        steps = [hqsim.zero_state(3)] + list(hqsim.moment_steps(OPS,
+                                                                n_qubits=3))
+        assert len(trace) == len(OPS) + 1 and trace.n_qubits == 3
+        assert trace[0].dtype == dtype
+        for k, state in enumerate(steps):
+            assert np.allclose(trace[k], state, atol=1e-6)
+
+def test_labels(tmp_path):
+    trace = hqtrace.record(str(tmp_path / "ops.trace"), OPS, n_qubits=3)
+    assert [trace.label(k) for k in range(len(trace))] == \
+        ["start", "H 0", "CZ 0 1", "H 1", "X 2", "H 2", "Z 0"]
+    path = str(tmp_path / "long.trace")
+    with TraceRecorder(path, 1) as rec:
+        rec.append([1, 0], "x"*40)
+        rec.append([0, 1])
+    trace = Trace.open(path)
+    assert trace.label(0) == "x"*hqtrace.LABEL and trace.label(1) == ""
+
+def test_truncated(tmp_path):
+    path = str(tmp_path / "cut.trace")
+    hqtrace.record(path, OPS, n_qubits=3)
+    with open(path, "r+b") as data:
+        data.truncate(os.path.getsize(path) - 5)
+    trace = Trace.open(path)
+    assert len(trace) == len(OPS)
+    assert np.allclose(trace[-1], hqsim.simulate(OPS[:-1], n_qubits=3))
+    # a step whose label was not written is ignored as well
+    with open(path + ".idx", "r+b") as index:
+        index.truncate(hqtrace.LABEL*3 + 1)
+    assert len(Trace.open(path)) == 3
+    with TraceRecorder(path, 2):
+        pass
+    assert len(Trace.open(path)) == 0
+
+def test_diff_overlap(tmp_path):
+    rng = np.random.default_rng(43)
+    states = rng.normal(size=(3, 32)) + 1j*rng.normal(size=(3, 32))
+    states[1] = states[0]
+    states[1, [3, 17, 30]] += [1, 1j, -2]
+    path = str(tmp_path / "random.trace")
+    with TraceRecorder(path, 5) as rec:
+        for state in states:
+            rec.append(state)
+    trace = Trace.open(path)
+    for block in (1, 5, 8, 32, 2**20):
+        indices, change = trace.diff(0, 1, block=block)
+        assert list(indices) == [3, 17, 30]
+        assert np.allclose(change, [1, 1j, -2])
+        indices, change = trace.diff(0, 2, atol=1.0, block=block)
+        delta = states[2] - states[0]
+        assert np.array_equal(indices, np.flatnonzero(np.abs(delta) > 1.0))
+        assert np.allclose(change, delta[indices])
+        assert np.isclose(trace.overlap(0, 2, block=block),
+                          np.vdot(states[0], states[2]))
+
+def test_bad_input(tmp_path):
+    path = str(tmp_path / "bad.trace")
+    with pytest.raises(ValueError):
+        TraceRecorder(path, 2, dtype=np.float64)
+    with TraceRecorder(path, 2) as rec:
+        with pytest.raises(ValueError):
+            rec.append(np.zeros(8))
+    with open(path, "r+b") as data:
+        data.write(b"NOPE")
+    with pytest.raises(ValueError):
+        Trace.open(path)
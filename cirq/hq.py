@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+Command line entry point for the Hello Quantum puzzles and the
+Deutsch-Jozsa examples.
+
+    python hq.py run 3_3 --reps 1000 --backend auto --jobs 8
+    python hq.py prob 3_3
+    python hq.py grid 3_3
+    python hq.py verify
+    python hq.py dj --n 12 --oracle parity
+    python hq.py export all --out hq_results
+    python hq.py bench
+
+run --seed and dj keep their results in the on-disk cache of
+hqAnalysis.hqcache when --cache DIR (or $HQ_CACHE) is given.
+
+Only argparse is imported up front; numpy, matplotlib and cirq are imported
+inside the subcommands that need them, so --help and the pure probability
+commands start quickly.
+"""
+
+import argparse
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HQ_DIR = os.path.join(HERE, "HelloQuantum")
+DJ_DIR = os.path.join(HERE, "DeutschJozsa")
+# the classical solvers djAnalysis.djcompare runs
+PY_DIR = os.path.join(os.path.dirname(HERE), "python")
+
+for _path in (HQ_DIR, DJ_DIR, PY_DIR):
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+#%%
+
+def _puzzle_names(names):
+    """ expand "all" into every puzzle name """
+    from hqAnalysis.hqpuzzles import PUZZLES
+    if "all" in names:
+        return list(PUZZLES)
+    unknown = [name for name in names if name not in PUZZLES]
+    if unknown:
+        raise SystemExit("unknown puzzle: %s" % ", ".join(unknown))
+    return names
+
+def _run_numpy(job):
+    """ simulate and sample one puzzle; a single argument for pool.map """
+    import numpy as np
+    from hqAnalysis import hqpuzzles, hqsim
+    name, reps, seed, cache_dir = job
+    ops = hqpuzzles.puzzle_ops(name)
+
+    def compute():
+        trace = np.array([hqsim.zero_state()] + list(hqsim.moment_steps(ops)))
+        return {"distribution": np.abs(trace[-1])**2,
+                "counts": hqsim.sample(trace[-1], reps, seed),
+                "trace": trace}
+
+    # sampled counts can only be reused when the seed fixes them
+    if cache_dir is None or seed is None:
+        result = compute()
+    else:
+        from hqAnalysis.hqcache import ResultCache, circuit_key
+        key = circuit_key(ops, "numpy", reps, seed)
+        result = ResultCache(cache_dir).cached(key, compute)
+    return name, hqsim.histograms(result["counts"])
+
+def _run_cirq(name):
+    """ run the original script under cirq """
+    import runpy
+    cwd = os.getcwd()
+    os.chdir(HQ_DIR)
+    try:
+        runpy.run_path("hq_%s.py" % name, run_name="__main__")
+    finally:
+        os.chdir(cwd)
+
+def cmd_run(args):
+    """ sample the final measurement of each puzzle """
+    names = _puzzle_names(args.puzzles)
+    if args.backend == "cirq":
+        for name in names:
+            _run_cirq(name)
+        return
+    jobs = [(name, args.reps, args.seed, args.cache) for name in names]
+    if args.jobs > 1 and len(jobs) > 1:
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(args.jobs) as pool:
+            results = list(pool.map(_run_numpy, jobs))
+    else:
+        results = [_run_numpy(job) for job in jobs]
+    for name, hists in results:
+        print("puzzle %s: %s" % (name, " ".join(
+            "%s=%s" % (key, hists[key]) for key in sorted(hists))))
+
+def cmd_prob(args):
+    """ print the exact grid probabilities of each puzzle """
+    import numpy as np
+    from hqAnalysis import hqexact, hqhelp as hh, hqpuzzles, hqsim
+    stages = ("init",) if args.stage == "init" else ("init", "solution")
+    for name in _puzzle_names(args.puzzles):
+        ops = hqpuzzles.puzzle_ops(name, stages)
+        state = hqsim.simulate(ops)
+        print("puzzle %s (%s)" % (name, args.stage))
+        print("  %-10s %s" % ("state", hqexact.simulate(ops)))
+        for label, func in (("std upper", hh.p_std_upper),
+                            ("bell upper", hh.p_bell_upper),
+                            ("std lower", hh.p_std_lower),
+                            ("bell lower", hh.p_bell_lower),
+                            ("std/std", hh.p_std), ("bell/bell", hh.p_bell),
+                            ("std/bell", hh.p_sb), ("bell/std", hh.p_bs)):
+            print("  %-10s %s" % (label, np.around(func(state), 3)))
+
+def cmd_grid(args):
+    """ plot the Hello Quantum grid of a puzzle """
+    from hqAnalysis import hqhelp as hh, hqpuzzles, hqsim
+    stages = ("init",) if args.stage == "init" else ("init", "solution")
+    state = hqsim.simulate(hqpuzzles.puzzle_ops(args.puzzle, stages))
+    hh.hq_grid(state, to_file=args.save is not None, name=args.save or "")
+
+def cmd_dj(args):
+    """ run Deutsch-Jozsa on one of the function families """
+    import numpy as np
+    from djAnalysis import djcompare, djsim
+    constant, make_f = djcompare.FAMILIES[args.oracle]
+    n = args.n
+
+    def compute():
+        state = djsim.dj_initial_state(n, phase_oracle=True)
+        djsim.apply_diagonal(state, djsim.phase_diagonal(make_f(n), n),
+                             range(n))
+        djsim.wht(state, range(n))
+        return {"distribution": djsim.input_probabilities(state, n)}
+
+    if args.cache is None:
+        probs = compute()["distribution"]
+    else:
+        import inspect
+        from hqAnalysis.hqcache import ResultCache, circuit_key
+        # keyed on the family's definition, so an edited family is not
+        # served the old result, without evaluating it on 2^n inputs
+        try:
+            definition = inspect.getsource(make_f)
+        except (OSError, TypeError):
+            definition = make_f.__code__.co_code.hex()
+        key = circuit_key("dj phase oracle", "numpy", n=n,
+                          oracle=args.oracle, definition=definition)
+        probs = ResultCache(args.cache).cached(key, compute)["distribution"]
+    verdict = "constant" if np.isclose(probs[0], 1) else "balanced"
+    print("n=%d oracle=%s verdict=%s (expected %s) P(all 0)=%.6f" %
+          (n, args.oracle, verdict, "constant" if constant else "balanced",
+           probs[0]))
+    if args.reps:
+        from djAnalysis import djsample
+        # probs are probabilities already, not amplitudes to square
+        with djsample.SharedDistribution.from_probabilities(probs) as dist:
+            counts = djsample.sample_counts(dist, args.reps, jobs=args.jobs,
+                                            seed=args.seed)
+        for outcome in np.flatnonzero(counts):
+            print("  %s: %d" % (np.binary_repr(outcome, n), counts[outcome]))
+
+def cmd_verify(args):
+    """ check the solutions against their target grids """
+    from hqAnalysis import hqverify
+    names = None if "all" in args.puzzles else _puzzle_names(args.puzzles)
+    if not hqverify.report(names):
+        raise SystemExit(1)
+
+def cmd_tomo(args):
+    """ estimate a puzzle state from streamed shot batches """
+    import numpy as np
+    from hqAnalysis import hqpauli, hqpuzzles, hqsim, hqtomo
+    stages = ("init",) if args.stage == "init" else ("init", "solution")
+    state = hqsim.simulate(hqpuzzles.puzzle_ops(args.puzzle, stages))
+    rng = np.random.default_rng(args.seed)
+    tomo = hqtomo.Tomography(2)
+    for batch in range(args.batches):
+        for setting in hqtomo.settings(2):
+            tomo.update(setting, hqtomo.measure(state, setting, args.shots,
+                                                rng))
+        print("%7d shots  fidelity %.4f" % (tomo.total_shots(),
+                                            tomo.fidelity(state)))
+    means = tomo.expectations()
+    low, high = tomo.intervals()
+    for pauli in ("ZI", "XI", "IZ", "IX", "ZZ", "XX", "ZX", "XZ"):
+        index = tuple(hqpauli.PAULIS.index(p) for p in pauli)
+        print("  <%s> = %+.3f  [%+.3f, %+.3f]" % (pauli, means[index],
+                                                   low[index], high[index]))
+
+def cmd_export(args):
+    """ write each puzzle's trace, shot records and counts as tables """
+    from hqAnalysis import hqexport
+    for name in _puzzle_names(args.puzzles):
+        print(hqexport.export_puzzle(args.out, name, args.reps, args.seed))
+
+def cmd_bench(args):
+    """ time the numpy paths """
+    import time
+    import numpy as np
+    from hqAnalysis import hqpuzzles, hqsim
+    from djAnalysis import djsim
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for name in hqpuzzles.PUZZLES:
+            hqsim.simulate(hqpuzzles.puzzle_ops(name))
+    per = (time.perf_counter() - start)/args.repeat
+    print("all %d puzzles: %.6f s" % (len(hqpuzzles.PUZZLES), per))
+
+    for n in args.dj:
+        diagonal = djsim.phase_diagonal(lambda x: x & 1, n)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            state = djsim.dj_initial_state(n, phase_oracle=True)
+            djsim.apply_diagonal(state, diagonal, range(n))
+            djsim.wht(state, range(n))
+            np.abs(state[(0,)*n])**2
+        per = (time.perf_counter() - start)/args.repeat
+        print("dj n=%2d: %.6f s" % (n, per))
+
+#%%
+
+def make_parser():
+    """ the argument parser for all subcommands """
+    parser = argparse.ArgumentParser(prog="hq", description=__doc__.split(
+        "\n\n")[0].strip())
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+
+    run = sub.add_parser("run", help="sample puzzle measurements")
+    run.add_argument("puzzles", nargs="+",
+                     help="puzzle names like 3_3, or all")
+    run.add_argument("--reps", type=int, default=20)
+    run.add_argument("--backend", choices=("auto", "numpy", "cirq"),
+                     default="auto",
+                     help="auto uses the numpy simulator; cirq runs the "
+                     "original script")
+    run.add_argument("--jobs", type=int, default=1)
+    run.add_argument("--seed", type=int, default=None)
+    run.add_argument("--cache", default=os.environ.get("HQ_CACHE"),
+                     help="result cache directory (default $HQ_CACHE); "
+                     "used when --seed is given")
+    run.set_defaults(func=cmd_run)
+
+    prob = sub.add_parser("prob", help="exact grid probabilities")
+    prob.add_argument("puzzles", nargs="+")
+    prob.add_argument("--stage", choices=("init", "solution"),
+                      default="solution")
+    prob.set_defaults(func=cmd_prob)
+
+    grid = sub.add_parser("grid", help="plot the Hello Quantum grid")
+    grid.add_argument("puzzle")
+    grid.add_argument("--stage", choices=("init", "solution"),
+                      default="solution")
+    grid.add_argument("--save", default=None, help="also save to this file")
+    grid.set_defaults(func=cmd_grid)
+
+    dj = sub.add_parser("dj", help="run Deutsch-Jozsa")
+    dj.add_argument("--n", type=int, default=8)
+    dj.add_argument("--oracle", default="parity",
+                    choices=("zero", "one", "low bit", "high bit", "parity"))
+    dj.add_argument("--reps", type=int, default=0)
+    dj.add_argument("--seed", type=int, default=None)
+    dj.add_argument("--jobs", type=int, default=1,
+                    help="worker processes for sampling --reps shots")
+    dj.add_argument("--cache", default=os.environ.get("HQ_CACHE"),
+                    help="result cache directory (default $HQ_CACHE)")
+    dj.set_defaults(func=cmd_dj)
+
+    verify = sub.add_parser("verify", help="check solutions reach targets")
+    verify.add_argument("puzzles", nargs="*", default=["all"])
+    verify.set_defaults(func=cmd_verify)
+
+    tomo = sub.add_parser("tomo", help="estimate a state from shots")
+    tomo.add_argument("puzzle")
+    tomo.add_argument("--stage", choices=("init", "solution"),
+                      default="solution")
+    tomo.add_argument("--shots", type=int, default=100,
+                      help="shots per setting in each batch")
+    tomo.add_argument("--batches", type=int, default=5)
+    tomo.add_argument("--seed", type=int, default=None)
+    tomo.set_defaults(func=cmd_tomo)
+
+    export = sub.add_parser("export", help="export traces and records")
+    export.add_argument("puzzles", nargs="+")
+    export.add_argument("--out", default="hq_results")
+    export.add_argument("--reps", type=int, default=1000)
+    export.add_argument("--seed", type=int, default=None)
+    export.set_defaults(func=cmd_export)
+
+    bench = sub.add_parser("bench", help="time the numpy simulators")
+    bench.add_argument("--repeat", type=int, default=10)
+    bench.add_argument("--dj", type=int, nargs="*", default=[8, 12, 16, 20])
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+def main(argv=None):
+    """ parse argv and run the subcommand """
+    args = make_parser().parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,17 @@ Created on Mon Oct  1 23:29:48 2018
 
 @author: pyaephyohein
 """
+import time
+import numpy as np
 from djsolver import djsolver
 from djsolver import solve
 from djsolver import random_solve
+from djsolver import Nrandom_solve
+from djsolver import query_solve
+from djsolver import sample_size
+from djsolver import confidence_solve
+from djsolver import CountingOracle
+from djsolver import parallel_solve
 
 g0 = lambda x: x%2 == 0 
 g1 = lambda x: 1
@@ -23,4 +31,85 @@ def test_g2():
     assert solve(g2,3) == "constant"
 
 def test_g3():
-    assert random_solve(g0,3) == "balanced"
\ No newline at end of file
+    assert random_solve(g0,3,seed=0) == "balanced"
+    assert random_solve(g1,3,seed=0) == "constant"
+    assert Nrandom_solve(g1,3,5,seed=0) == "constant"
+    assert Nrandom_solve(g0,10,30,seed=0) == "balanced"
+
+def test_query_solve():
+    assert query_solve(g0,3) == ("balanced", 2)
+    assert query_solve(g1,3) == ("constant", 5)
+    assert query_solve(lambda x: x >= 512, 10) == ("balanced", 513)
+
+def test_query_solve_block():
+    assert query_solve(g0,10,block=64) == ("balanced", 64)
+    assert query_solve(lambda x: x*0 + 1,10,block=64) == ("constant", 513)
+
+def test_query_solve_cache():
+    cache = {}
+    assert query_solve(g0,3,cache=cache) == ("balanced", 2)
+    assert query_solve(g0,3,cache=cache) == ("balanced", 0)
+    calls = []
+    def h(xs):
+        calls.append(len(xs))
+        return xs >= 512
+    cache = {x: False for x in range(100)}
+    assert query_solve(h,10,block=64,cache=cache) == ("balanced", 413)
+    assert query_solve(h,10,block=64,cache=cache) == ("balanced", 0)
+    assert sum(calls) == 413 and calls[0] == 28
+
+def test_sample_size():
+    assert sample_size(3, 0.0) == (5, 0.0)
+    k, bound = sample_size(20, 0.01)
+    assert k == 8 and bound <= 0.01
+    assert sample_size(64, 0.0) == (2**63 + 1, 0.0)
+    k, bound = sample_size(64, 1e-300)
+    assert k == 998 and 0 < bound <= 1e-300
+
+def test_confidence_solve():
+    verdict, bound, queries = confidence_solve(g1, 20, error=1e-6, seed=1)
+    assert verdict == "constant" and bound <= 1e-6
+    assert queries == sample_size(20, 1e-6)[0]
+    assert confidence_solve(g1, 3, error=0.0) == ("constant", 0.0, 5)
+    assert confidence_solve(g0, 64, error=0.0) == ("balanced", 0.0, 2)
+    assert confidence_solve(g0, 40, error=1e-9, seed=2)[0] == "balanced"
+    assert confidence_solve(g0, 40, vectorized=True, seed=2)[0] == "balanced"
+
+def test_counting_oracle():
+    oracle = CountingOracle(g0)
+    assert djsolver(oracle,3) == "balanced"
+    assert oracle.queries == 2 and oracle.calls == 2
+    assert list(oracle(np.array([0, 1, 2]))) == [True, False, True]
+    assert oracle.queries == 3 and oracle.calls == 3
+    assert oracle(1) == False and oracle.calls == 3
+
+def slow_g0(x):
+    time.sleep(0.01)
+    return g0(x)
+
+def test_parallel_solve():
+    verdict, queries = parallel_solve(slow_g0, 10, workers=4)
+    assert verdict == "balanced" and queries < 32
+    assert parallel_solve(g1, 5, workers=3, chunk=4) == ("constant", 17)
+
+def test_parallel_solve_rounds():
+    # the old scan queued two rounds of chunks and evaluated 2*workers
+    # inputs; now a round is cut short once a value differs, and at most
+    # the two completions before that can start another evaluation
+    calls = []
+    def f(x):
+        calls.append(x)
+        time.sleep(0.05)
+        return g0(x)
+    verdict, queries = parallel_solve(f, 10, workers=4)
+    time.sleep(0.1)
+    assert verdict == "balanced"
+    assert queries <= len(calls) <= 4 + 2
+
+def test_confidence_solve_parallel():
+    assert confidence_solve(g1, 8, workers=2, seed=0)[0] == "constant"
+    assert confidence_solve(g0, 8, error=1e-9, workers=2, seed=0)[0] == "balanced"
+
+def test_large_n():
+    assert confidence_solve(g0, 64, error=1e-9, seed=4)[0] == "balanced"
+    assert confidence_solve(g1, 64, error=1e-9, seed=4)[0] == "constant"
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio versions of the Deutsch-Jozsa solvers for oracles behind an RPC
+boundary.
+
+f is an async function of one input.  At most limit queries are in flight at
+once, each query has an optional timeout and is retried with exponential
+backoff on timeouts and connection errors, and all outstanding queries are
+cancelled as soon as two values differ.
+
+OracleServer is a local asyncio stand-in for a remote oracle and
+RemoteOracle is the matching client, for testing.
+"""
+import asyncio
+import itertools
+
+from djperm import FeistelPermutation
+from djsolver import sample_size
+
+RETRY_ERRORS = (asyncio.TimeoutError, ConnectionError, OSError)
+
+async def query(f, x, timeout=None, retries=0, backoff=0.05):
+    """
+    await f(x) with a timeout, retrying up to retries times on a timeout or
+    connection error and waiting backoff*2^attempt between attempts.
+    """
+    for attempt in itertools.count():
+        try:
+            return await asyncio.wait_for(f(x), timeout)
+        except RETRY_ERRORS:
+            if attempt >= retries:
+                raise
+            await asyncio.sleep(backoff * 2**attempt)
+
+async def async_scan(f, inputs, limit=8, timeout=None, retries=0,
+                     backoff=0.05):
+    """
+    Query f on inputs with at most limit queries in flight until two values
+    differ, then cancel the rest.
+
+    Returns (whether two values differed, number of answered queries).
+    """
+    it = iter(inputs)
+    first = []
+    answered = [0]
+    found = asyncio.Event()
+
+    async def worker():
+        for x in it:
+            value = await query(f, x, timeout, retries, backoff)
+            answered[0] += 1
+            if not first:
+                first.append(value)
+            elif value != first[0]:
+                found.set()
+                return
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(limit)]
+    stopped = asyncio.ensure_future(found.wait())
+    try:
+        pending = set(workers)
+        while pending and not found.is_set():
+            done, pending = await asyncio.wait(
+                pending | {stopped}, return_when=asyncio.FIRST_COMPLETED)
+            pending.discard(stopped)
+            for task in done - {stopped}:
+                if not found.is_set():
+                    task.result()
+    finally:
+        for task in workers + [stopped]:
+            task.cancel()
+        await asyncio.gather(*workers, stopped, return_exceptions=True)
+    return found.is_set(), answered[0]
+
+async def async_djsolver(f, n, limit=8, timeout=None, retries=0):
+    """
+    Deterministic solver over the 2^(n-1)+1 deciding inputs.
+    Returns (verdict, number of queries).
+    """
+    differs, queries = await async_scan(f, range(2**(n-1) + 1), limit,
+                                        timeout, retries)
+    return ("balanced" if differs else "constant"), queries
+
+async def async_confidence_solve(f, n, error=0.01, limit=8, timeout=None,
+                                 retries=0, seed=None):
+    """
+    Randomized solver on distinct random inputs, as djsolver.confidence_solve.
+    Returns (verdict, error bound, number of queries).
+    """
+    k, bound = sample_size(n, error)
+    xs = FeistelPermutation(n, seed).take(k)
+    differs, queries = await async_scan(f, xs.tolist(), limit, timeout,
+                                        retries)
+    if differs:
+        return "balanced", 0.0, queries
+    return "constant", bound, queries
+
+#%%
+
+class OracleServer:
+    """
+    Serves f over TCP on localhost: each connection sends one input as a
+    line of text and gets back "0" or "1".  delay seconds are spent on every
+    answer, and every fail_every-th request is dropped without an answer.
+    Use as an async context manager; the port is chosen by the system.
+    """
+
+    def __init__(self, f, delay=0.0, fail_every=0, host="127.0.0.1"):
+        self.f = f
+        self.delay = delay
+        self.fail_every = fail_every
+        self.host = host
+        self.port = None
+        self.requests = 0
+        self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            line = await reader.readline()
+            self.requests += 1
+            if self.fail_every and self.requests % self.fail_every == 0:
+                return
+            await asyncio.sleep(self.delay)
+            writer.write(b"%d\n" % int(bool(self.f(int(line)))))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+class RemoteOracle:
+    """
+    Async client for an OracleServer: await oracle(x) gives f(x) as a bool.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    async def __call__(self, x):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(b"%d\n" % int(x))
+            await writer.drain()
+            line = await reader.readline()
+        finally:
+            writer.close()
+        if not line:
+            raise ConnectionError("oracle closed the connection")
+        return line.strip() == b"1"
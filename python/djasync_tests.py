@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the asyncio solvers against the local stand-in oracle server
+"""
+import asyncio
+import pytest
+from djasync import async_djsolver
+from djasync import async_confidence_solve
+from djasync import OracleServer
+from djasync import RemoteOracle
+
+g0 = lambda x: x%2 == 0
+g1 = lambda x: 1
+
+async def solve_remote(f, n, **kwargs):
+    async with OracleServer(f, delay=0.01) as server:
+        oracle = RemoteOracle(server.host, server.port)
+        return await async_djsolver(oracle, n, **kwargs)
+
+def test_async_djsolver():
+    verdict, queries = asyncio.run(solve_remote(g0, 10, limit=4))
+    assert verdict == "balanced" and queries < 16
+    assert asyncio.run(solve_remote(g1, 4, limit=4)) == ("constant", 9)
+
+def test_async_confidence_solve():
+    async def local(x):
+        return g1(x)
+    verdict, bound, queries = asyncio.run(
+        async_confidence_solve(local, 20, error=1e-3, seed=0))
+    assert verdict == "constant" and bound <= 1e-3
+
+def test_retry():
+    async def run(retries):
+        async with OracleServer(g1, fail_every=3) as server:
+            oracle = RemoteOracle(server.host, server.port)
+            return await async_djsolver(oracle, 3, limit=1, retries=retries)
+    assert asyncio.run(run(1)) == ("constant", 5)
+    with pytest.raises(ConnectionError):
+        asyncio.run(run(0))
+
+def test_timeout():
+    async def slow(x):
+        await asyncio.sleep(1)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(async_djsolver(slow, 3, timeout=0.01))
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Generators of constant and balanced boolean functions for testing the
+Deutsch-Jozsa solvers at scale.
+
+Every generator returns a djtable.TruthTable and is built with whole-array
+numpy operations: random balanced tables are a random permutation of a
+half-ones table, and the structured families (parity, threshold, k-junta)
+are built one input bit at a time by doubling, never one input at a time.
+"""
+import numpy as np
+
+from djtable import TruthTable
+
+def _doubled(n, start, step):
+    """
+    Array a over all 2**n inputs built one bit at a time, low-order bit
+    first: a = start for zero bits, and adding the bit of value 2**i maps a
+    to concat(a, step(a, i)).
+    """
+    values = np.asarray(start)
+    for i in range(n):
+        values = np.concatenate((values, step(values, i)))
+    return values
+
+def _popcounts(n, mask):
+    """ popcount(x & mask) for every x on n bits """
+    return _doubled(n, np.zeros(1, dtype=np.int64),
+                    lambda a, i: a + (mask >> i & 1))
+
+#%%
+
+def constant_table(n, value=None, seed=None):
+    """
+    A constant function, with a random value unless value is given
+    """
+    if value is None:
+        value = np.random.default_rng(seed).integers(2)
+    return TruthTable.from_bits(np.full(2**n, bool(value)))
+
+def balanced_table(n, seed=None):
+    """
+    A uniformly random balanced function: a random permutation of a table
+    with 2**(n-1) ones
+    """
+    values = np.zeros(2**n, dtype=bool)
+    values[:2**(n-1)] = True
+    return TruthTable.from_bits(np.random.default_rng(seed).permutation(values))
+
+def random_table(n, seed=None):
+    """
+    A constant or balanced function with equal probability, and its label
+    """
+    rng = np.random.default_rng(seed)
+    if rng.integers(2):
+        return "constant", constant_table(n, seed=rng)
+    return "balanced", balanced_table(n, seed=rng)
+
+def balanced_batch(n, count, seed=None):
+    """
+    count independent random balanced functions on n bits as a
+    (count, bytes) uint8 array, one packed truth table per row.  Each row
+    can be wrapped as TruthTable(row, n).
+    """
+    values = np.zeros((count, 2**n), dtype=bool)
+    values[:, :2**(n-1)] = True
+    values = np.random.default_rng(seed).permuted(values, axis=1)
+    return np.packbits(values, axis=1)
+
+#%%
+
+def parity_table(n, mask=None):
+    """
+    f(x) = parity of the bits of x selected by mask (all bits by default).
+    Balanced for every nonzero mask.
+    """
+    if mask is None:
+        mask = 2**n - 1
+    return TruthTable.from_bits(_popcounts(n, mask) % 2 == 1)
+
+def threshold_table(n, t):
+    """
+    f(x) = 1 when x has at least t one bits.  Balanced when n is odd and
+    t = (n+1)/2, constant when t = 0 or t > n.
+    """
+    return TruthTable.from_bits(_popcounts(n, 2**n - 1) >= t)
+
+def junta_table(n, k, g=None, seed=None):
+    """
+    A k-junta: f depends only on k randomly chosen bits of x, through the
+    table g on k bits (a random balanced one by default, which makes f
+    balanced).  Returns the table and the chosen bit positions, counted from
+    the high-order end.
+    """
+    rng = np.random.default_rng(seed)
+    bits = np.sort(rng.choice(n, size=k, replace=False))
+    if g is None:
+        g = balanced_table(k, seed=rng).values()
+    weight = dict((b, 2**(k - 1 - j)) for j, b in enumerate(bits))
+    index = _doubled(n, np.zeros(1, dtype=np.int64),
+                     lambda a, i: a + weight.get(n - 1 - i, 0))
+    return TruthTable.from_bits(np.asarray(g, dtype=bool)[index]), bits
+
+#%%
+
+def bench(ns=(8, 16, 20, 24), count=10, seed=None):
+    """
+    Print the time to generate count random balanced tables and decide each
+    with the block-vectorized solver, for each n in ns.
+    """
+    import time
+    from djsolver import query_solve
+
+    rng = np.random.default_rng(seed)
+    print("%4s %12s %12s" % ("n", "generate", "solve"))
+    for n in ns:
+        start = time.perf_counter()
+        tables = [balanced_table(n, seed=rng) for _ in range(count)]
+        middle = time.perf_counter()
+        for table in tables:
+            query_solve(table, n, block=4096)
+        end = time.perf_counter()
+        print("%4d %12.6f %12.6f" % (n, (middle - start)/count,
+                                     (end - middle)/count))
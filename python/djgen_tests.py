@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Property tests for the function generators
+"""
+import numpy as np
+from djtable import TruthTable
+from djsolver import query_solve
+from djgen import constant_table
+from djgen import balanced_table
+from djgen import random_table
+from djgen import balanced_batch
+from djgen import parity_table
+from djgen import threshold_table
+from djgen import junta_table
+
+def test_constant_and_balanced():
+    for n in (1, 3, 8, 16):
+        assert constant_table(n, seed=n).verdict() == "constant"
+        assert balanced_table(n, seed=n).verdict() == "balanced"
+    assert constant_table(4, value=1).popcount() == 16
+
+def test_seeded():
+    assert np.array_equal(balanced_table(10, seed=3).bits,
+                          balanced_table(10, seed=3).bits)
+
+def test_solvers_agree():
+    for seed in range(50):
+        label, table = random_table(6, seed=seed)
+        assert query_solve(table, 6)[0] == label
+
+def test_balanced_batch():
+    batch = balanced_batch(4, 100000, seed=0)
+    assert batch.shape == (100000, 2)
+    ones = np.unpackbits(batch, axis=1).sum(axis=1)
+    assert np.all(ones == 8)
+    assert TruthTable(batch[0], 4).verdict() == "balanced"
+
+def test_structured():
+    x = np.arange(2**8)
+    assert list(parity_table(8)(x)) == [bin(v).count("1") % 2 == 1 for v in x]
+    assert parity_table(8, mask=0b100).verdict() == "balanced"
+    assert threshold_table(7, 4).verdict() == "balanced"
+    assert threshold_table(7, 0).verdict() == "constant"
+    assert list(threshold_table(3, 2)(np.arange(8))) == [0, 0, 0, 1, 0, 1, 1, 1]
+
+def test_junta():
+    table, bits = junta_table(10, 3, seed=1)
+    assert table.verdict() == "balanced"
+    values = table.values()
+    for b in set(range(10)) - set(bits):
+        flipped = np.arange(2**10) ^ (1 << (9 - b))
+        assert np.array_equal(values, values[flipped])
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+A keyed pseudo-random permutation of [0, 2^n) in O(1) memory.
+
+FeistelPermutation is a balanced Feistel network over n bits (n + 1 bits for
+odd n, cycle-walking back into range) with a splitmix64 round function.
+Taking perm(0), perm(1), ... gives distinct pseudo-random inputs for any n up
+to 64 without ever allocating an array of size 2^n, which is what the
+randomized solvers in djsolver need.
+"""
+import numpy as np
+
+ROUNDS = 4
+
+def _mix(z):
+    """ splitmix64 finalizer on a uint64 array """
+    z = z + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+class FeistelPermutation:
+    """
+    A pseudo-random permutation of the integers 0 .. 2^n - 1 chosen by seed
+    (fresh entropy when seed is None).  Call it on an integer or an array of
+    integers; results are uint64.
+    """
+
+    def __init__(self, n, seed=None, rounds=ROUNDS):
+        if not 0 <= n <= 64:
+            raise ValueError("n must be between 0 and 64, got %d" % n)
+        self.n = n
+        self.half = (n + 1) // 2
+        self.mask = np.uint64(2**self.half - 1)
+        rng = np.random.default_rng(seed)
+        self.keys = rng.integers(0, 2**63, size=rounds, dtype=np.uint64)
+
+    def _encrypt(self, x):
+        """ one pass of the Feistel network over 2*half bits """
+        shift = np.uint64(self.half)
+        left, right = x >> shift, x & self.mask
+        for key in self.keys:
+            left, right = right, left ^ (_mix(right ^ key) & self.mask)
+        return (left << shift) | right
+
+    def __call__(self, x):
+        scalar = np.ndim(x) == 0
+        x = np.atleast_1d(np.asarray(x, dtype=np.uint64))
+        if self.n < 64 and np.any(x >> np.uint64(self.n)):
+            raise ValueError("input out of range for %d bits" % self.n)
+        with np.errstate(over="ignore"):
+            y = self._encrypt(x)
+            if self.n < 2*self.half:
+                # odd n: walk the cycle until it comes back into range
+                out = y >> np.uint64(self.n) != 0
+                while np.any(out):
+                    y[out] = self._encrypt(y[out])
+                    out = y >> np.uint64(self.n) != 0
+        return y[0] if scalar else y
+
+    def take(self, k, start=0):
+        """ perm(start), ..., perm(start + k - 1) as an array """
+        return self(np.arange(start, start + k, dtype=np.uint64))
+
+    def __iter__(self):
+        """ lazily yield perm(0), perm(1), ... in blocks """
+        block = 1024
+        for start in range(0, 2**self.n, block):
+            for x in self.take(min(block, 2**self.n - start), start):
+                yield x
+
+def sample_distinct(n, k, seed=None):
+    """ k distinct pseudo-random inputs on n bits, as a uint64 array """
+    return FeistelPermutation(n, seed).take(k)
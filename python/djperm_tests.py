@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the Feistel permutation sampler
+"""
+import numpy as np
+import pytest
+from djperm import FeistelPermutation
+from djperm import sample_distinct
+
+def test_is_permutation():
+    for n in (0, 1, 2, 5, 8, 11):
+        values = FeistelPermutation(n, seed=n).take(2**n)
+        assert sorted(values.tolist()) == list(range(2**n))
+
+def test_lazy_iteration():
+    perm = FeistelPermutation(7, seed=1)
+    assert list(perm) == perm.take(2**7).tolist()
+
+def test_large_n():
+    xs = sample_distinct(64, 10000, seed=2)
+    assert len(set(xs.tolist())) == 10000
+    assert np.all(sample_distinct(63, 1000, seed=2) < 2**63)
+    assert np.array_equal(xs, sample_distinct(64, 10000, seed=2))
+
+def test_range():
+    with pytest.raises(ValueError):
+        FeistelPermutation(4)(16)
+    with pytest.raises(ValueError):
+        FeistelPermutation(65)
@@ -4,9 +4,14 @@ Spyder Editor
 
 This is a temporary script file.
 """
+import concurrent.futures
+import itertools
 import random
+import threading
 import numpy as np
 
+from djperm import FeistelPermutation
+
 num = random.randint(1,11)
 
 g0 = lambda x: x%2 == 0 
@@ -25,59 +30,284 @@ l0 = [2, 5, 10, 6, 8, 14, 12, 9]
 
 
 def solve(f,n):
-    val = np.random.permutation((2**n)-1)
+    last = (2**n) - 2
     for i in range((n//4)+1):
         #print(i)
-        print(int(f(i)))
-        print(int(f((len(val) -1) -i)))
-        if f(i) != f((len(val) -1) -i):
+        if f(i) != f(last - i):
             return ("balanced")
     return ("constant")
 #print(solve(g0,4))
 #print(solve(g1,4))
 
 def djsolver (f,n):
-    for c in range(1,(2**(n-1)+1)):
-        print (c)
-        print (f(c))
-        if f(c) != f(0): 
-            return ("balanced")
+    return query_solve(f,n)[0]
 
-    return ("constant")
+def query_solve(f, n, block=None, cache=None):
+    """
+    Deterministic Deutsch-Jozsa solver.  f is known to be constant or
+    balanced on n bits, so 2^(n-1)+1 distinct inputs always decide it and
+    the first value that differs from f(0) means balanced.
+
+    With block set, f must accept a numpy array of inputs and is evaluated
+    that many inputs at a time.  cache is an optional dict of already known
+    values of f, updated with every new value; only inputs not in it are
+    counted as queries.
+
+    Returns (verdict, number of queries).
+    """
+    limit = 2**(n-1) + 1
+    if cache is None:
+        cache = {}
+    queries = 0
+
+    if block is None:
+        for x in range(limit):
+            if x not in cache:
+                cache[x] = f(x)
+                queries += 1
+            if cache[x] != cache[0]:
+                return "balanced", queries
+        return "constant", queries
+
+    for start in range(0, limit, block):
+        xs = range(start, min(start + block, limit))
+        missing = [x for x in xs if x not in cache]
+        if missing:
+            values = np.broadcast_to(np.asarray(f(np.array(missing))),
+                                     (len(missing),))
+            cache.update(zip(missing, values.tolist()))
+            queries += len(missing)
+        if any(cache[x] != cache[0] for x in xs):
+            return "balanced", queries
+    return "constant", queries
 
 #print(djsolver(g0,3))
 #print(djsolver(g1,5))
     
-def random_solve(f,n):
-    a = b = 0
-    while a == b:
-        val = np.random.randint(0,high=(2**n),size=(2,1))
-        print(val)
-        a = val[0]
-        b = val[1]
-        
-    
-    print(a)
-    print(b)
+def random_solve(f,n,seed=None):
+    """
+    One-sided randomized test: f on two distinct random inputs.  Different
+    values prove balanced; equal values answer constant, which is wrong for
+    a balanced f with probability (2^(n-1)-1)/(2^n-1), just under 1/2.
+    """
+    a, b = FeistelPermutation(n, seed).take(2)
     if f(a) != f(b):
         return("balanced")
     else :
-        return np.random.choice(["balanced","constant"],p=[1/3,2/3])
+        return("constant")
         
 #print(random_solve(g0,4))
         
-def Nrandom_solve(f,n,k):
-    count =  0
+def Nrandom_solve(f,n,k,seed=None):
+    """
+    k independent runs of random_solve; balanced if any run proves it, so
+    a balanced f is missed with probability below 2^-k.
+    """
+    rng = np.random.default_rng(seed)
     for i in range(k):
-        random_solve(f,n)
-        if random_solve(f,n) == "balanced":
-            count = count + 1
-    if count > (k-count):
-        return ("balanced")
-    else:
-        return ("constant")
+        if random_solve(f,n,int(rng.integers(2**32))) == "balanced":
+            return ("balanced")
+    return ("constant")
         
 
 #print(Nrandom_solve(g0,3,5))
 
-    
\ No newline at end of file
+def sample_size(n, error):
+    """
+    Smallest number k of distinct inputs such that a balanced f on n bits
+    gives k equal values with probability at most error, together with that
+    probability.  At k = 2^(n-1)+1 the probability is 0.
+
+    The probability after k inputs is 2 prod_{j<k} (2^(n-1)-j)/(2^n-j) <=
+    2^(1-k), so only k up to 1 - log2(error) are looked at, in one
+    cumulative product.
+    """
+    half = 2**(n-1)
+    if error <= 0:
+        return half + 1, 0.0
+    top = min(half, int(np.ceil(1 - np.log2(error))) + 1)
+    j = np.arange(top, dtype=np.float64)
+    bounds = 2.0*np.concatenate([[1.0], np.cumprod((half - j)/(2*half - j))])
+    k = int(np.argmax(bounds <= error))
+    if bounds[k] <= error:
+        return k, float(bounds[k])
+    return half + 1, 0.0
+
+def confidence_solve(f, n, error=0.01, vectorized=False, seed=None,
+                     workers=None, chunk=1, processes=False):
+    """
+    Randomized Deutsch-Jozsa classifier with a bounded error.  Draws the
+    sample size needed for the target error probability as distinct inputs
+    in one batch from a FeistelPermutation, so any n up to 64 works, then
+    answers balanced as soon as two values differ.  A constant verdict is
+    wrong with probability at most the returned bound; a balanced verdict is
+    always right.  With error 0 this is query_solve (or parallel_solve).
+
+    With vectorized, f is called once on the whole batch of inputs.  With
+    workers, the inputs are spread over a pool as in parallel_scan.
+
+    Returns (verdict, error bound, number of queries).
+    """
+    k, bound = sample_size(n, error)
+    if bound == 0.0:
+        # no error allowed: every deciding input may be needed
+        if workers is not None:
+            verdict, queries = parallel_solve(f, n, workers, chunk, processes)
+        else:
+            verdict, queries = query_solve(f, n,
+                                           block=2**16 if vectorized else None)
+        return verdict, 0.0, queries
+    xs = FeistelPermutation(n, seed).take(k)
+
+    if workers is not None:
+        differs, queries = parallel_scan(f, xs.tolist(), workers, chunk,
+                                         processes)
+        if differs:
+            return "balanced", 0.0, queries
+        return "constant", bound, queries
+
+    if vectorized:
+        values = np.broadcast_to(np.asarray(f(xs)), xs.shape)
+        if np.any(values != values[0]):
+            return "balanced", 0.0, k
+        return "constant", bound, k
+
+    first = f(xs[0])
+    for i in range(1, k):
+        if f(xs[i]) != first:
+            return "balanced", 0.0, i + 1
+    return "constant", bound, k
+
+class CountingOracle:
+    """
+    Wraps f so every solver can be charged for the queries it makes.  Values
+    are cached, so queries counts distinct inputs and calls counts how many
+    times f itself was evaluated.  Accepts a single input or an array.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.cache = {}
+        self.calls = 0
+
+    @property
+    def queries(self):
+        """ number of distinct inputs queried """
+        return len(self.cache)
+
+    def __call__(self, x):
+        if np.ndim(x) == 0:
+            key = int(x)
+            if key not in self.cache:
+                self.cache[key] = self.f(x)
+                self.calls += 1
+            return self.cache[key]
+
+        xs = np.asarray(x)
+        keys = xs.ravel().tolist()
+        missing = sorted(set(k for k in keys if k not in self.cache))
+        if missing:
+            values = np.broadcast_to(np.asarray(self.f(np.array(missing))),
+                                     (len(missing),))
+            self.cache.update(zip(missing, values.tolist()))
+            self.calls += 1
+        return np.array([self.cache[k] for k in keys]).reshape(xs.shape)
+
+class _Scan:
+    """
+    The stop flag and first value shared by the threads of a scan, so each
+    thread stops on its own once any value differs from the first.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.first = []
+
+    def record(self, value):
+        with self.lock:
+            if not self.first:
+                self.first.append(value)
+            elif value != self.first[0]:
+                self.stop.set()
+
+def _eval_chunk(f, xs, scan=None):
+    """
+    Values of f on the inputs xs, stopping early once the scan is stopped.
+    """
+    values = []
+    for x in xs:
+        if scan is not None and scan.stop.is_set():
+            break
+        values.append(f(x))
+        if scan is not None:
+            scan.record(values[-1])
+    return values
+
+def parallel_scan(f, inputs, workers=4, chunk=1, processes=False):
+    """
+    Evaluate f on inputs over a thread pool (or a process pool when
+    processes is set, which needs a picklable f) in chunks of chunk inputs,
+    keeping one chunk per worker in flight.  As soon as two values differ,
+    nothing more is submitted, pending chunks are cancelled and the pool is
+    shut down without waiting: running thread chunks see the shared stop
+    flag and end after their current evaluation, which is not counted.
+    Process chunks cannot see the flag; a running one finishes its whole
+    chunk in the background and none of it is counted either.
+
+    Returns (whether two values differed, number of evaluations made).
+    """
+    pool_type = (concurrent.futures.ProcessPoolExecutor if processes
+                 else concurrent.futures.ThreadPoolExecutor)
+    scan = None if processes else _Scan()
+    it = iter(inputs)
+    first = []
+    queries = 0
+    differs = False
+
+    pool = pool_type(workers)
+    pending = set()
+
+    def submit():
+        xs = list(itertools.islice(it, chunk))
+        if xs:
+            pending.add(pool.submit(_eval_chunk, f, xs, scan))
+
+    try:
+        for _ in range(workers):
+            submit()
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            pending.difference_update(done)
+            for future in done:
+                values = future.result()
+                queries += len(values)
+                if values and not first:
+                    first.append(values[0])
+                if any(v != first[0] for v in values):
+                    differs = True
+            if differs:
+                break
+            for _ in done:
+                submit()
+    finally:
+        if scan is not None:
+            scan.stop.set()
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=not differs, cancel_futures=differs)
+    return differs, queries
+
+def parallel_solve(f, n, workers=4, chunk=1, processes=False):
+    """
+    Deterministic Deutsch-Jozsa solver for expensive f: the 2^(n-1)+1
+    deciding inputs are evaluated concurrently with parallel_scan, so a
+    balanced f is usually decided after the first wave of evaluations.
+
+    Returns (verdict, number of queries).
+    """
+    inputs = range(2**(n-1) + 1)
+    differs, queries = parallel_scan(f, inputs, workers, chunk, processes)
+    return ("balanced" if differs else "constant"), queries
+
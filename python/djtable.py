@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Bit-packed truth tables for boolean functions on n bits.
+
+A TruthTable evaluates f once and keeps one bit per input, in np.packbits
+order (input x is bit 7 - x%8 of byte x//8).  Saved tables are memory-mapped,
+so lookups, popcounts and Walsh coefficients stream through the file and a
+table for n = 32 (512 MiB) never has to be loaded into RAM.
+
+A TruthTable is callable on a single input or a numpy array of inputs, so it
+can be handed to any of the solvers in djsolver in place of f, and to
+djsim.phase_diagonal to build a phase oracle.
+"""
+import numpy as np
+
+MAGIC = b"DJTT"
+VERSION = 1
+HEADER = 16
+
+# largest n for which walsh() builds the whole spectrum (2**26 int64, 512 MiB)
+MAX_WALSH_BITS = 26
+
+# number of 1 bits in every byte value
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def _evaluate(f, xs):
+    """
+    Values of f on the array xs as booleans, calling f once on the whole
+    array when it accepts one and once per input otherwise.
+    """
+    try:
+        values = np.broadcast_to(np.asarray(f(xs)), xs.shape)
+    except (TypeError, ValueError):
+        values = np.array([f(int(x)) for x in xs])
+    return np.asarray(values, dtype=bool)
+
+def _fwht(spectrum):
+    """
+    In-place fast Walsh-Hadamard transform along the first axis (of length
+    2**k) of an int64 array.
+    """
+    step = 1
+    while step < len(spectrum):
+        view = spectrum.reshape((-1, 2, step) + spectrum.shape[1:])
+        lo = view[:, 0].copy()
+        view[:, 0] += view[:, 1]
+        view[:, 1] = lo - view[:, 1]
+        step *= 2
+    return spectrum
+
+class TruthTable:
+    """
+    The truth table of a boolean function on n bits, bit-packed.  bits is a
+    uint8 array or np.memmap of 2**n/8 bytes (at least one).
+    """
+
+    def __init__(self, bits, n):
+        self.bits = bits
+        self.n = n
+
+    @classmethod
+    def build(cls, f, n, path=None, block=2**20):
+        """
+        Evaluate f on all 2**n inputs, block inputs at a time, into a new
+        table.  With a path the table is written to that file and memory
+        mapped, otherwise it is kept in memory.
+        """
+        size = max(1, 2**n // 8)
+        if path is None:
+            bits = np.zeros(size, dtype=np.uint8)
+        else:
+            with open(path, "wb") as out:
+                out.write(MAGIC + bytes([VERSION, n]) +
+                          bytes(HEADER - len(MAGIC) - 2))
+            bits = np.memmap(path, dtype=np.uint8, mode="r+", offset=HEADER,
+                             shape=(size,))
+        block = max(8, block - block % 8)
+        for start in range(0, 2**n, block):
+            xs = np.arange(start, min(start + block, 2**n), dtype=np.int64)
+            packed = np.packbits(_evaluate(f, xs))
+            bits[start // 8:start // 8 + len(packed)] = packed
+        if path is not None:
+            bits.flush()
+            return cls.open(path)
+        return cls(bits, n)
+
+    @classmethod
+    def from_bits(cls, values):
+        """
+        A table from an array of 2**n function values
+        """
+        n = int(np.log2(len(values)))
+        return cls(np.packbits(np.asarray(values, dtype=bool)), n)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory map a table saved by build, read only
+        """
+        with open(path, "rb") as src:
+            header = src.read(HEADER)
+        if header[:len(MAGIC)] != MAGIC or header[len(MAGIC)] != VERSION:
+            raise ValueError("%s is not a version %d truth table"
+                             % (path, VERSION))
+        n = header[len(MAGIC) + 1]
+        bits = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER,
+                         shape=(max(1, 2**n // 8),))
+        return cls(bits, n)
+
+    def save(self, path):
+        """
+        Write the table to path and return the memory-mapped copy
+        """
+        return TruthTable.build(self, self.n, path)
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=np.int64)
+        value = (self.bits[x >> 3] >> (7 - (x & 7))) & 1
+        return value.astype(bool) if value.ndim else bool(value)
+
+    def values(self, start=0, stop=None):
+        """
+        The function values on inputs start .. stop-1 as a boolean array
+        """
+        if stop is None:
+            stop = 2**self.n
+        first, last = start // 8, (stop + 7) // 8
+        unpacked = np.unpackbits(np.asarray(self.bits[first:last]))
+        return unpacked[start - 8*first:stop - 8*first].astype(bool)
+
+    def popcount(self, block=2**24):
+        """
+        Number of inputs with f(x) = 1, streamed block bytes at a time
+        """
+        total = 0
+        for start in range(0, len(self.bits), block):
+            chunk = np.asarray(self.bits[start:start + block])
+            total += int(POPCOUNT[chunk].sum(dtype=np.int64))
+        return total
+
+    def verdict(self):
+        """
+        "constant", "balanced" or "neither", from the popcount
+        """
+        ones = self.popcount()
+        if ones in (0, 2**self.n):
+            return "constant"
+        if 2*ones == 2**self.n:
+            return "balanced"
+        return "neither"
+
+    def walsh_coefficient(self, a, block=2**20):
+        """
+        The Walsh coefficient sum_x (-1)^(f(x) + a.x), streamed over the
+        table block inputs at a time.  a = 0 gives 2**n - 2*popcount, which
+        is +-2**n exactly when f is constant.
+        """
+        total = 0
+        a = np.int64(a)
+        for start in range(0, 2**self.n, block):
+            stop = min(start + block, 2**self.n)
+            xs = np.arange(start, stop, dtype=np.int64) & a
+            parity = self.values(start, stop).astype(np.int64)
+            while np.any(xs):
+                parity ^= xs & 1
+                xs = xs >> 1
+            total += (stop - start) - 2*int(parity.sum())
+        return total
+
+    def walsh_block(self, index, bits):
+        """
+        The 2**bits Walsh coefficients for a = index*2**bits up to
+        (index+1)*2**bits - 1.  Writing x = high*2**bits + low, each slice of
+        the table with a fixed high is transformed on its own and added with
+        the sign (-1)^(index.high), so memory is O(2**bits) for any n.  This
+        reads the whole table for one block; use walsh_file for the whole
+        spectrum.
+        """
+        size = 2**bits
+        total = np.zeros(size, dtype=np.int64)
+        for high in range(2**self.n // size):
+            values = self.values(high*size, (high + 1)*size)
+            part = _fwht(1 - 2*values.astype(np.int64))
+            if bin(high & index).count("1") % 2:
+                total -= part
+            else:
+                total += part
+        return total
+
+    def walsh_file(self, path, bits=20):
+        """
+        The full Walsh spectrum written to an int64 np.memmap at path, for
+        tables too large for walsh().  Writing x = high*2**bits + low, the
+        first pass transforms every slice of 2**bits inputs once over low;
+        the second runs the butterflies over high, for a block of columns at
+        a time.  Memory is O(2**bits) and each pass reads the file once.
+        """
+        bits = min(bits, self.n)
+        size, rows = 2**bits, 2**(self.n - bits)
+        out = np.memmap(path, dtype=np.int64, mode="w+", shape=(2**self.n,))
+        for high in range(rows):
+            values = self.values(high*size, (high + 1)*size)
+            out[high*size:(high + 1)*size] = _fwht(
+                1 - 2*values.astype(np.int64))
+        table = out.reshape(rows, size)
+        cols = max(1, size // rows)
+        for col in range(0, size, cols):
+            block = np.array(table[:, col:col + cols])
+            table[:, col:col + cols] = _fwht(block)
+        out.flush()
+        return out
+
+    def walsh(self):
+        """
+        The full Walsh spectrum of f as an int64 array of 2**n coefficients,
+        by a fast Walsh-Hadamard transform.  Needs the spectrum in memory,
+        so n is limited to MAX_WALSH_BITS; use walsh_file beyond that.
+        """
+        if self.n > MAX_WALSH_BITS:
+            raise ValueError("the spectrum of %d bits needs %d GiB; use "
+                             "walsh_file" % (self.n, 2**(self.n - 27)))
+        return _fwht(1 - 2*self.values().astype(np.int64))
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the bit-packed truth table store
+"""
+import numpy as np
+import pytest
+import djtable
+from djtable import TruthTable
+from djsolver import query_solve
+from djsolver import djsolver
+
+g0 = lambda x: x%2 == 0
+g1 = lambda x: 1
+g3 = lambda x: x < 3
+
+def test_lookup():
+    table = TruthTable.build(g0, 10, block=64)
+    assert table(4) and not table(7)
+    assert list(table(np.arange(6))) == [True, False]*3
+    assert list(TruthTable.build(g3, 2)(np.arange(4))) == [1, 1, 1, 0]
+
+def test_verdict():
+    assert TruthTable.build(g0, 12).verdict() == "balanced"
+    assert TruthTable.build(g1, 12).verdict() == "constant"
+    assert TruthTable.build(g3, 2).verdict() == "neither"
+    assert TruthTable.build(g1, 1).popcount() == 2
+
+def test_walsh():
+    table = TruthTable.build(g0, 6)
+    spectrum = table.walsh()
+    assert spectrum[0] == table.walsh_coefficient(0, block=8) == 0
+    assert spectrum[1] == table.walsh_coefficient(1, block=8) == -64
+    assert np.count_nonzero(spectrum) == 1
+
+def test_walsh_file(tmp_path, monkeypatch):
+    table = TruthTable.build(lambda x: (x*37 >> 3) % 3 == 1, 9)
+    spectrum = table.walsh()
+    assert np.array_equal(table.walsh_block(5, 4), spectrum[80:96])
+    for bits in (2, 4, 6, 9, 12):
+        path = str(tmp_path / ("walsh%d" % bits))
+        assert np.array_equal(table.walsh_file(path, bits), spectrum)
+    monkeypatch.setattr(djtable, "MAX_WALSH_BITS", 8)
+    with pytest.raises(ValueError):
+        table.walsh()
+
+def test_saved(tmp_path):
+    path = str(tmp_path / "g0.tt")
+    TruthTable.build(g0, 16, path, block=1024)
+    table = TruthTable.open(path)
+    assert table.n == 16 and table.popcount() == 2**15
+    assert djsolver(table, 16) == "balanced"
+    assert query_solve(table, 16, block=256) == ("balanced", 256)